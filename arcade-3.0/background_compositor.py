@@ -0,0 +1,90 @@
+import arcade
+from constants import *
+from shader_manager import get_program
+
+VERTEX_SHADER = """
+#version 330
+in vec2 in_vert;
+in vec2 in_uv;
+out vec2 uv;
+void main() {
+    gl_Position = vec4(in_vert, 0., 1.);
+    uv = in_uv;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+uniform sampler2D sky;
+uniform float sky_height;
+uniform vec4 view; // left, bottom, width, height of the camera in world units
+{declarations}
+in vec2 uv;
+out vec4 fragColor;
+
+// Same result as drawing src over dst with the default blend function
+vec4 over(vec4 dst, vec4 src) {{
+    return vec4(src.rgb * src.a + dst.rgb * (1. - src.a), src.a * src.a + dst.a * (1. - src.a));
+}}
+
+vec4 layer(sampler2D strip, vec4 rect, vec2 world) {{
+    vec2 p = (world - rect.xy) / rect.zw;
+    if (p.y < 0. || p.y > 1.) return vec4(0.);
+    return texture(strip, p);
+}}
+
+void main() {{
+    vec2 world = view.xy + uv * view.zw;
+    vec4 color = vec4(texture(sky, vec2(0.5, world.y / sky_height)).rgb, 1.);
+{layers}
+    fragColor = color;
+}}
+"""
+
+def build_fragment_shader(layer_count):
+    declarations = "".join(
+        f"uniform sampler2D layer{i};\nuniform vec4 layer_rect{i}; // strip offset, y, width, height\n"
+        for i in range(layer_count))
+    layers = "".join(
+        f"    color = over(color, layer(layer{i}, layer_rect{i}, world));\n"
+        for i in range(layer_count))
+    return FRAGMENT_SHADER.format(declarations=declarations, layers=layers)
+
+class BackgroundCompositor:
+    # Sky and parallax layers in a single full-screen pass. The sky gradient is baked into
+    # a texture once per resolution and each layer is a wrapped strip scrolled by its UVs.
+    def __init__(self, layers):
+        self.ctx = arcade.get_window().ctx
+        self.layers = layers
+        self.program = get_program(self.ctx, VERTEX_SHADER, build_fragment_shader(len(layers)))
+        self.quad = arcade.gl.geometry.quad_2d_fs()
+        self.sky = None
+        self.sky_height = None
+
+    def get_sky(self, height):
+        # One texel per row, from SKY_BLUE at the bottom to DEEP_SKY_BLUE at the top
+        if height != self.sky_height:
+            bottom, top = arcade.color.SKY_BLUE, arcade.color.DEEP_SKY_BLUE
+            data = bytearray()
+            for y in range(height):
+                t = (y + 0.5) / height
+                data += bytes(round(b + (a - b) * t) for a, b in zip(top[:3], bottom[:3])) + b"\xff"
+            self.sky = self.ctx.texture((1, height), components=4, data=bytes(data),
+                filter=(self.ctx.LINEAR, self.ctx.LINEAR))
+            self.sky_height = height
+        return self.sky
+
+    def draw(self, camera: arcade.camera.Camera2D, layer_ys):
+        height = max(1, int(camera.projection_height))
+        self.get_sky(height).use(0)
+        self.program["sky"] = 0
+        self.program["sky_height"] = height
+        self.program["view"] = camera.left, camera.bottom, camera.projection_width, camera.projection_height
+        for i, (layer, y) in enumerate(zip(self.layers, layer_ys)):
+            layer.get_texture(self.ctx).use(i + 1)
+            self.program[f"layer{i}"] = i + 1
+            self.program[f"layer_rect{i}"] = layer.get_offset(camera), y, layer.width, layer.height
+
+        # Every pixel is written, so nothing needs blending with what was there
+        with self.ctx.enabled_only():
+            self.quad.render(self.program)
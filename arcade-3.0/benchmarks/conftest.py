@@ -0,0 +1,51 @@
+"""
+Benchmarks for the game's hot paths, built on pytest-benchmark.
+
+    python -m pytest benchmarks --benchmark-autosave     # run and store the results as JSON in .benchmarks/
+    python -m pytest benchmarks --benchmark-compare      # run and compare against the last stored run
+    python -m pytest benchmarks --benchmark-compare=0001 --benchmark-compare-fail=mean:10%
+    pytest-benchmark compare 0001 0002                   # compare two stored runs without rerunning
+
+Times are reported in microseconds, so a tick-sized function reads directly as its cost per tick.
+"""
+import os
+import sys
+import pytest
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR)
+from sopwith import use_offscreen_if_no_display
+use_offscreen_if_no_display()
+
+def pytest_configure(config):
+    if config.getoption("benchmark_time_unit", None) is None:
+        config.option.benchmark_time_unit = "us"
+
+@pytest.fixture(autouse=True)
+def game_dir(monkeypatch):
+    # Levels and textures are loaded relative to the game directory
+    monkeypatch.chdir(GAME_DIR)
+
+@pytest.fixture(scope="session")
+def window():
+    import arcade
+    window = arcade.Window(800, 600, "benchmarks", visible=False)
+    yield window
+    window.close()
+
+@pytest.fixture
+def world(game_dir):
+    from world import World
+    world = World()
+    world.setup()
+    yield world
+    world.close()
+
+@pytest.fixture
+def generated_world(game_dir):
+    # Endless level from a fixed seed, so every run flies over the same terrain
+    from world import World
+    world = World(level_seed=1)
+    world.setup()
+    yield world
+    world.close()
@@ -0,0 +1,57 @@
+import pytest
+import arcade
+from background_compositor import BackgroundCompositor
+from explosion import Explosion
+from hud import Hud
+from parallax_background_layer import ParallaxBackgroundLayer
+from shader_manager import ShaderManager, pack_explosion_instances
+from constants import *
+
+@pytest.mark.parametrize("count", [10, 100])
+def test_pack_explosion_instances(benchmark, window, count):
+    camera = arcade.camera.Camera2D()
+    explosions = [Explosion((i * 50, 200), 1.0, i * 0.01) for i in range(count)]
+    benchmark(pack_explosion_instances, 1.5, explosions, camera)
+
+@pytest.mark.parametrize("scale", EXPLOSION_RENDER_SCALES)
+def test_explosion_pass(benchmark, window, scale):
+    # Includes a GPU sync, so it measures the fill cost each render scale saves
+    camera = arcade.camera.Camera2D()
+    shader_manager = ShaderManager(window.get_size(), scale=scale, adaptive=False)
+    explosions = [Explosion((100 + i * 60, 300), 2.0, 0.0) for i in range(10)]
+
+    def render():
+        shader_manager.render(0.2, explosions, camera)
+        window.ctx.finish()
+    benchmark(render)
+
+def test_background_pass(benchmark, window):
+    # Sky and both parallax layers, scrolling, including a GPU sync
+    camera = arcade.camera.Camera2D()
+    layers = [
+        ParallaxBackgroundLayer("background_layer_1.png", "background_layer_1_2.png", BACKGROUND_LAYER_1_SPEED),
+        ParallaxBackgroundLayer("background_layer_2.png", "background_layer_2_2.png", BACKGROUND_LAYER_2_SPEED),
+    ]
+    background = BackgroundCompositor(layers)
+    positions = iter(range(0, 10 ** 9, 7))
+
+    def draw():
+        camera.position = (next(positions), camera.position[1])
+        background.draw(camera, [300, 50])
+        window.ctx.finish()
+    benchmark(draw)
+
+def test_shader_manager_resize(benchmark, window):
+    # Toggling between two window sizes, as fullscreen does, after both are in the pool
+    shader_manager = ShaderManager((800, 600))
+    sizes = iter([(1920, 1080), (800, 600)] * 10 ** 6)
+    benchmark(lambda: shader_manager.set_resolution(next(sizes)))
+
+def test_shader_manager_create(benchmark, window):
+    # Programs come from the source hash cache after the first one
+    benchmark(ShaderManager, (800, 600))
+
+def test_hud_update_unchanged(benchmark, window):
+    # The per-tick HUD update when nothing changed, which is almost every tick
+    hud = Hud()
+    benchmark(lambda: (hud.score.set(0), hud.health.set(MAX_HEALTH), hud.fps.set(0)))
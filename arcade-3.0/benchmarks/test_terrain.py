@@ -0,0 +1,37 @@
+import random
+
+def sample_xs(count, low, high):
+    # Seeded, so every run and every compared run queries the same points
+    rng = random.Random(0)
+    return [rng.uniform(low, high) for _ in range(count)]
+
+def test_get_y_from_terrain(benchmark, world):
+    xs = sample_xs(100, -500, 40000)
+
+    def query():
+        for x in xs:
+            world.get_y_from_terrain(x)
+    benchmark(query)
+
+def test_heights_at(benchmark, world):
+    xs = sample_xs(1000, -500, 40000)
+    benchmark(world.terrain_index.heights_at, xs)
+
+def test_binary_search(benchmark, world):
+    benchmark(world.binary_search, 12345)
+
+def test_get_visible_terrain(benchmark, world):
+    benchmark(world.get_visible_terrain, 10000, 10000 + 800 + 2 * 350)
+
+def test_generate_chunk(benchmark):
+    from terrain_generator import TerrainGenerator
+    benchmark(TerrainGenerator(1).generate, 12)
+
+def test_generated_set_resident(benchmark, generated_world):
+    level = generated_world.level
+    chunks = set(level.chunk_terrain)
+    benchmark(level.set_resident, chunks)
+
+def test_generated_heights_at(benchmark, generated_world):
+    xs = sample_xs(1000, -2000, 2000)
+    benchmark(generated_world.terrain_index.heights_at, xs)
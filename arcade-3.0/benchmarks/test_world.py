@@ -0,0 +1,77 @@
+import pytest
+from constants import *
+from projectiles import *
+from input_recording import InputRecorder
+from targeting import solve_intercepts
+
+def raise_pool_caps(world, count):
+    # The sprite pools cap projectiles in flight as the game does, lift that so every spawn lands
+    for sprite_pool in world.projectiles.sprite_pools.values():
+        sprite_pool.cap = max(sprite_pool.cap, count)
+
+def spawn_projectiles(world, count):
+    # Half plane bullets, half target bullets, spread across the screen in front of the plane
+    world.plane.center_y = 400
+    raise_pool_caps(world, count)
+    for i in range(count):
+        if i % 2:
+            world.fire_bullet()
+        else:
+            target = world.targets[i % len(world.targets)]
+            world.target_fire_bullet(target, 90.0)
+    pool = world.projectiles
+    for n, slot in enumerate(pool.slots(KIND_BULLET)):
+        pool.x[slot] = 50 + n * 700 / count
+        pool.y[slot] = 300 + n % 200
+    for n, slot in enumerate(pool.slots(KIND_TARGET_BULLET)):
+        pool.x[slot] = 50 + n * 700 / count
+        pool.y[slot] = 200 + n % 300
+    pool.prev_x[:] = pool.x
+    pool.prev_y[:] = pool.y
+    pool.sync(*world.get_visible_range())
+
+@pytest.mark.parametrize("count", [10, 100, 1000])
+def test_check_collisions(benchmark, world, count):
+    def setup():
+        for sprite in [s for s in world.projectiles.sprites if s is not None]:
+            world.projectiles.remove(sprite)
+        spawn_projectiles(world, count)
+    benchmark.pedantic(world.check_collisions, setup=setup, rounds=20)
+
+@pytest.mark.parametrize("count", [10, 100, 1000])
+def test_update_bullets(benchmark, world, count):
+    raise_pool_caps(world, count)
+    for _ in range(count):
+        world.fire_bullet()
+    assert len(world.projectiles.slots(KIND_BULLET)) == count
+    benchmark(world.projectiles.step, FIXED_TIMESTEP, world.time)
+
+@pytest.mark.parametrize("count", [10, 100, 1000])
+def test_update_bombs(benchmark, world, count):
+    raise_pool_caps(world, count)
+    for _ in range(count):
+        world.prev_bomb_time = -BOMB_DROP_INTERVAL
+        world.drop_bomb()
+    assert len(world.projectiles.slots(KIND_BOMB)) == count
+    benchmark(world.projectiles.step, FIXED_TIMESTEP, world.time)
+
+def test_update_projectiles_with_sync(benchmark, world):
+    spawn_projectiles(world, 200)
+    benchmark(world.update_projectiles, FIXED_TIMESTEP)
+
+@pytest.mark.parametrize("count", [1, 10, 100])
+def test_solve_intercepts(benchmark, count):
+    x = [i * 700 / count for i in range(count)]
+    y = [100 + i % 5 * 20 for i in range(count)]
+    benchmark(solve_intercepts, x, y, (400, 400), (6, 1))
+
+def test_tick(benchmark, world):
+    world.accelerate()
+    benchmark(world.tick)
+
+def test_tick_recording(benchmark, world, tmp_path):
+    # Recording adds one run comparison per tick, and a write when the input changes
+    world.accelerate()
+    world.recorder = InputRecorder(tmp_path / "session.rec", world)
+    benchmark(world.tick)
+    world.recorder.close()
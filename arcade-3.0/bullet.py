@@ -3,11 +3,15 @@ import math
 from constants import *
 
 class Bullet(arcade.SpriteCircle):
-    def __init__(self, plane, time):
+    def __init__(self):
         super().__init__(2, arcade.color.YELLOW)
+
+    def launch(self, plane, time):
+        # Bullets are pooled, so everything a previous shot changed is set again here
         self.center_x = plane.center_x
         self.center_y = plane.center_y
         angle = (360 - plane.angle) % 360
         self.change_x = math.cos(math.radians(angle)) * BULLET_SPEED
         self.change_y = math.sin(math.radians(angle)) * BULLET_SPEED
-        self.start_time = time
\ No newline at end of file
+        self.alpha = 255
+        self.start_time = time
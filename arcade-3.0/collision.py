@@ -0,0 +1,130 @@
+from arcade.geometry import are_polygons_intersecting
+
+# Analytic shape tests on plain coordinates, so hot collision checks need no sprite,
+# texture or hit box to be built for the "other" shape. The swept tests take a circle
+# moving from (x0, y0) to (x1, y1) during a tick, so fast projectiles cannot skip
+# over thin shapes between two ticks.
+
+def point_in_polygon(x, y, points):
+    # Even-odd rule ray cast
+    inside = False
+    x1, y1 = points[-1]
+    for x2, y2 in points:
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+def segment_distance_sq(px, py, x1, y1, x2, y2):
+    # Squared distance from a point to the segment (x1, y1)-(x2, y2)
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length_sq))
+    ex, ey = x1 + t * dx - px, y1 + t * dy - py
+    return ex * ex + ey * ey
+
+def in_segment_bounds(px, py, x1, y1, x2, y2):
+    # For a point already known to be collinear with the segment, whether it lies on it
+    return min(x1, x2) <= px <= max(x1, x2) and min(y1, y2) <= py <= max(y1, y2)
+
+def segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+    def cross(ox, oy, px, py, qx, qy):
+        return (px - ox) * (qy - oy) - (py - oy) * (qx - ox)
+    d1 = cross(cx, cy, dx, dy, ax, ay)
+    d2 = cross(cx, cy, dx, dy, bx, by)
+    d3 = cross(ax, ay, bx, by, cx, cy)
+    d4 = cross(ax, ay, bx, by, dx, dy)
+    if d1 * d2 < 0 and d3 * d4 < 0:
+        return True
+    # An endpoint on the other segment's line only touches it if it is within the segment
+    return ((d1 == 0 and in_segment_bounds(ax, ay, cx, cy, dx, dy)) or (d2 == 0 and in_segment_bounds(bx, by, cx, cy, dx, dy))
+            or (d3 == 0 and in_segment_bounds(cx, cy, ax, ay, bx, by)) or (d4 == 0 and in_segment_bounds(dx, dy, ax, ay, bx, by)))
+
+def segment_segment_distance_sq(ax, ay, bx, by, cx, cy, dx, dy):
+    if segments_intersect(ax, ay, bx, by, cx, cy, dx, dy):
+        return 0.0
+    return min(segment_distance_sq(ax, ay, cx, cy, dx, dy), segment_distance_sq(bx, by, cx, cy, dx, dy),
+               segment_distance_sq(cx, cy, ax, ay, bx, by), segment_distance_sq(dx, dy, ax, ay, bx, by))
+
+def circle_intersects_aabb(cx, cy, radius, left, bottom, right, top):
+    ex = cx - max(left, min(cx, right))
+    ey = cy - max(bottom, min(cy, top))
+    return ex * ex + ey * ey <= radius * radius
+
+def swept_circle_intersects_aabb(x0, y0, x1, y1, radius, left, bottom, right, top):
+    # Slab test of the path against the box grown by the radius. The grown box has square
+    # corners, so this is slightly generous there, which is fine for a broad phase.
+    t0, t1 = 0.0, 1.0
+    for start, delta, low, high in ((x0, x1 - x0, left - radius, right + radius), (y0, y1 - y0, bottom - radius, top + radius)):
+        if delta == 0:
+            if start < low or start > high:
+                return False
+            continue
+        a, b = (low - start) / delta, (high - start) / delta
+        if a > b:
+            a, b = b, a
+        t0, t1 = max(t0, a), min(t1, b)
+        if t0 > t1:
+            return False
+    return True
+
+def circle_intersects_polygon(cx, cy, radius, points):
+    if point_in_polygon(cx, cy, points):
+        return True
+    radius_sq = radius * radius
+    x1, y1 = points[-1]
+    for x2, y2 in points:
+        if segment_distance_sq(cx, cy, x1, y1, x2, y2) <= radius_sq:
+            return True
+        x1, y1 = x2, y2
+    return False
+
+def swept_circle_intersects_polygon(x0, y0, x1, y1, radius, points):
+    # The capsule swept by the circle touches the polygon if it starts inside it
+    # or its path comes within radius of an edge
+    if point_in_polygon(x0, y0, points):
+        return True
+    radius_sq = radius * radius
+    px, py = points[-1]
+    for qx, qy in points:
+        if segment_segment_distance_sq(x0, y0, x1, y1, px, py, qx, qy) <= radius_sq:
+            return True
+        px, py = qx, qy
+    return False
+
+def get_hit_shape(sprite):
+    # (points, bounds, offset) of a sprite's hit box, where offset is added to the points and
+    # bounds. Sprites that cache their rotated shapes, like Plane, provide get_hit_shape().
+    if hasattr(sprite, "get_hit_shape"):
+        return sprite.get_hit_shape()
+    return sprite.hit_box.get_adjusted_points(), (sprite.left, sprite.bottom, sprite.right, sprite.top), (0, 0)
+
+def circle_intersects_sprite(cx, cy, radius, sprite):
+    points, (left, bottom, right, top), (ox, oy) = get_hit_shape(sprite)
+    cx, cy = cx - ox, cy - oy
+    if not circle_intersects_aabb(cx, cy, radius, left, bottom, right, top):
+        return False
+    return circle_intersects_polygon(cx, cy, radius, points)
+
+def swept_circle_intersects_sprite(x0, y0, x1, y1, radius, sprite):
+    points, (left, bottom, right, top), (ox, oy) = get_hit_shape(sprite)
+    x0, y0, x1, y1 = x0 - ox, y0 - oy, x1 - ox, y1 - oy
+    if not swept_circle_intersects_aabb(x0, y0, x1, y1, radius, left, bottom, right, top):
+        return False
+    return swept_circle_intersects_polygon(x0, y0, x1, y1, radius, points)
+
+def get_sprites_hitting(sprite, sprite_list):
+    # Like arcade.check_for_collision_with_list() for a spatially hashed list, but using
+    # the sprite's cached hit shape. Its polygon is only translated if a candidate is close.
+    points, (left, bottom, right, top), (ox, oy) = get_hit_shape(sprite)
+    left, bottom, right, top = left + ox, bottom + oy, right + ox, top + oy
+    world_points = None
+    hits = []
+    for other in sprite_list.spatial_hash.get_sprites_near_rect((left, right, bottom, top)):
+        if other.right < left or other.left > right or other.top < bottom or other.bottom > top:
+            continue
+        if world_points is None:
+            world_points = [(x + ox, y + oy) for x, y in points]
+        if are_polygons_intersecting(world_points, other.hit_box.get_adjusted_points()):
+            hits.append(other)
+    return hits
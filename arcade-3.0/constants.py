@@ -10,7 +10,7 @@ TILT_ANGLE = 2
 GRAVITY = -4.0  # Gravity constant
 TERRAIN_BUFFER = 350  # Additional buffer for smooth terrain rendering
 AIR_RESISTANCE = 0.987  # Air resistance factor
-MAX_EXPLOSIONS = 10
+MAX_EXPLOSIONS = 256  # Oldest explosion is dropped beyond this
 BULLET_SPEED = 10
 BOMB_DROP_INTERVAL = 0.5  # Time interval between bomb drops
 EXPLOSION_DURATION = 1.5  # Duration of the explosion effect
@@ -30,3 +30,70 @@ BOMB_SCALE = 0.3
 DEBUG_DRAW = False
 DRAW_FPS = True
 DEBUG_COLOR = (255, 0, 0, 64)
+
+TERRAIN_CHUNK_WIDTH = 1024  # Width of a cached terrain mesh chunk
+TERRAIN_CHUNK_POOL_SIZE = 8  # Number of terrain chunk meshes kept resident around the camera
+PROJECTILE_POOL_CAPACITY = 256  # Initial number of projectile slots, grows as needed
+COLLISION_CELL_SIZE = 128  # Spatial hash cell size for collision broad-phase
+TARGET_BUCKET_WIDTH = 256  # Width of an x bucket in the target activation index
+TARGET_ACTIVATION_MARGIN = 100  # Extra distance beyond TARGET_SHOOT_RANGE at which targets are simulated
+
+FIXED_TIMESTEP = 1 / 60  # Simulation tick length in seconds
+MAX_TICKS_PER_FRAME = 5  # Upper bound of simulation ticks run to catch up in a single frame
+
+DRAW_PROFILER = False  # Show the frame time graph, toggled with F3
+PROFILER_HISTORY = 240  # Number of frames kept in the frame time graph
+PROFILER_MAX_TRACE_EVENTS = 100000  # Trace events kept for the Chrome trace dump
+PROFILER_TRACE_FILE = "sopwith_trace.json"  # Written when F9 is pressed
+PROFILER_GRAPH_WIDTH = 240
+PROFILER_GRAPH_HEIGHT = 60
+PROFILER_GRAPH_MAX_MS = 50
+
+LEVEL_FILE = "level.bin"  # Compiled from terrain.txt and landscape.txt, see level_file.py
+TARGET_IMAGES = ["target1.png", "target2.png", "target3.png", "target4.png", "target5.png"]
+STREAM_RADIUS_CHUNKS = 2  # Level chunks kept loaded on each side of the camera
+STREAM_EVICT_CHUNKS = 3  # Chunks further than this from the camera are evicted with their targets
+STREAM_PREFETCH_TICKS = 60  # How far ahead of the plane's velocity chunks are read in the background
+
+LEVEL_SEED = None  # Set to an int to fly an endless level generated from this seed instead of LEVEL_FILE
+TERRAIN_MIN_HEIGHT = 5  # Generated terrain height range
+TERRAIN_MAX_HEIGHT = 500
+TERRAIN_STEP_MIN = 20  # Horizontal distance between generated contour points
+TERRAIN_STEP_MAX = 300
+TERRAIN_JITTER = 100  # Max vertical offset of a generated point from the line between chunk edges
+TERRAIN_BAND_COUNT = 5  # Color bands, see TERRAIN_COLORS
+RUNWAY_START_X = -550  # Flat ground around the plane's start position
+RUNWAY_END_X = 700
+RUNWAY_HEIGHT = 100
+TARGET_SPACING = 200  # Generated targets are at least this far apart
+TARGETS_PER_CHUNK_MIN = 2
+TARGETS_PER_CHUNK_MAX = 4
+TARGET_RUNWAY_CLEARANCE = 100  # Minimum distance between a generated target and the runway
+BULLET_POOL_SIZE = 128  # Max plane bullets in flight, all preallocated
+BOMB_POOL_SIZE = 16  # Max bombs in flight
+TARGET_BULLET_POOL_SIZE = 128  # Max target bullets in flight
+KILL_ZONE_COLOR = (255, 0, 0, 32)  # Debug drawing of explosion kill zones
+KILL_ZONE_RADIUS_STEP = 4  # Kill zone textures are cached per this many pixels of radius
+KILL_ZONE_TEXTURE_CACHE_SIZE = 48  # Most recently used kill zone textures kept
+EXPLOSION_INSTANCE_CAPACITY = 64  # Explosions the instance buffer holds before it is grown
+EXPLOSION_INSTANCE_SIZE = 16  # Bytes per explosion instance: position, size and start time as float32
+EXPLOSION_RENDER_SCALE = 1.0  # Resolution of the explosion pass relative to the window: 1, 0.5 or 0.25
+EXPLOSION_RENDER_SCALES = [1.0, 0.5, 0.25]  # Scales the adaptive mode steps through
+EXPLOSION_ADAPTIVE_SCALE = True  # Lower the explosion scale while frames run over budget
+EXPLOSION_FRAME_BUDGET = 1 / 50  # Frame time in seconds above which the explosion scale is lowered
+EXPLOSION_SCALE_UP_HEADROOM = 0.85  # Scale is raised again below this fraction of the budget
+EXPLOSION_SCALE_DOWN_FRAMES = 30  # Frames over budget before the scale is lowered
+EXPLOSION_SCALE_UP_FRAMES = 300  # Frames under budget before the scale is raised
+RESIZE_DEBOUNCE = 0.1  # Seconds a burst of resize events must settle before the framebuffers follow
+FRAMEBUFFER_POOL_SIZE = 6  # Framebuffers a ShaderManager keeps around, keyed by size
+HUD_FONT_SIZE = 14  # Font size of the HUD labels
+HUD_STATUS_TIME = 4.0  # Seconds a status message, like a written trace, stays on the HUD
+TARGET_BULLET_TICKS = round(BULLET_FADE_TIME_TARGET / FIXED_TIMESTEP)  # Ticks a target bullet flies before it fades, the aiming horizon
+TARGET_AIM_RETRY = 0.25  # Seconds a target without a firing solution waits before aiming again
+UPDATE_RATE = 1 / 60  # Seconds between on_update calls, each runs the world's due fixed ticks
+DRAW_RATE = 1 / 60  # Target seconds per drawn frame
+VSYNC = False  # Wait for the display refresh before showing a frame, toggled with V
+FRAME_LIMITER = False  # Pace frames to DRAW_RATE with sleep plus spin instead of pyglet's timer, toggled with L
+LIMITER_SPIN_TIME = 0.002  # Final part of each frame the limiter busy-waits instead of sleeping, in seconds
+LIMITER_DRAW_RATE = 1 / 1000  # Draw interval given to pyglet while the limiter does the pacing
+LATENCY_HISTORY = 120  # Input to frame latency samples averaged on the overlay
@@ -4,6 +4,7 @@ class Explosion:
         self.size = size
         self.orig_position = position
         self.start_time = start_time
+        self.kill_zone_radius = 0
         self.sprite = None
     
     def kill(self):
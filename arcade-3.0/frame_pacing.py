@@ -0,0 +1,83 @@
+import time
+from collections import deque
+from constants import *
+
+class FramePacer:
+    # Owns the window's draw pacing and measures what the player feels. With the limiter
+    # on, pyglet is asked to draw as often as it can and every frame is held back to
+    # draw_rate here, sleeping while it is safe to and spinning for the rest, which is far
+    # more precise than pyglet's timer. The spin starts at LIMITER_SPIN_TIME and grows
+    # whenever a sleep wakes up too late.
+    # Latency runs from a key press to the end of the first frame drawn after a tick has
+    # consumed it, limiter wait included. The swap and the display come on top of that.
+    def __init__(self, window, update_rate=UPDATE_RATE, draw_rate=DRAW_RATE, vsync=VSYNC, limiter=FRAME_LIMITER):
+        self.window = window
+        self.update_rate = update_rate
+        self.draw_rate = draw_rate
+        self.vsync = vsync
+        self.limiter = limiter
+        self.next_frame = None
+        self.spin_time = LIMITER_SPIN_TIME
+        self.pending_inputs = []
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+        self.fps = 0
+        self.latency_ms = 0
+        self.frame_count = 0
+        self.start_time = time.perf_counter()
+        self.mode = self.get_mode()
+
+    def toggle_vsync(self):
+        self.vsync = not self.vsync
+        self.window.set_vsync(self.vsync)
+        self.mode = self.get_mode()
+
+    def toggle_limiter(self):
+        self.limiter = not self.limiter
+        self.next_frame = None
+        self.window.set_draw_rate(LIMITER_DRAW_RATE if self.limiter else self.draw_rate)
+        self.mode = self.get_mode()
+
+    def get_mode(self):
+        return (f"vsync {'on' if self.vsync else 'off'}, limiter {'on' if self.limiter else 'off'}, "
+                f"draw {1 / self.draw_rate:.0f} Hz, update {1 / self.update_rate:.0f} Hz")
+
+    def input_received(self, tick_count):
+        # tick_count is the world's tick count when the key was pressed, the next tick applies it
+        self.pending_inputs.append((time.perf_counter(), tick_count))
+
+    def frame_drawn(self, tick_count):
+        now = time.perf_counter()
+        if self.pending_inputs:
+            waiting = []
+            for pressed, pressed_tick in self.pending_inputs:
+                if tick_count > pressed_tick:
+                    self.latencies.append((now - pressed) * 1000)
+                else:
+                    waiting.append((pressed, pressed_tick))
+            self.pending_inputs = waiting
+
+        # Averages over whole seconds, so the overlay changes about once a second
+        self.frame_count += 1
+        if now - self.start_time > 1:
+            self.fps = self.frame_count / (now - self.start_time)
+            self.latency_ms = sum(self.latencies) / len(self.latencies) if self.latencies else 0
+            self.start_time = now
+            self.frame_count = 0
+
+    def limit(self):
+        if not self.limiter:
+            return
+        now = time.perf_counter()
+        if self.next_frame is None or now - self.next_frame > self.draw_rate:
+            # First frame, or too far behind to catch up, start pacing from here
+            self.next_frame = now
+        else:
+            remaining = self.next_frame - now
+            if remaining > self.spin_time:
+                time.sleep(remaining - self.spin_time)
+                late = time.perf_counter() - self.next_frame
+                if late > 0:
+                    self.spin_time = min(self.spin_time + late, self.draw_rate / 4)
+            while time.perf_counter() < self.next_frame:
+                pass
+        self.next_frame += self.draw_rate
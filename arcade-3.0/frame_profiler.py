@@ -0,0 +1,77 @@
+import arcade
+import json
+import time
+from collections import deque
+from constants import *
+from profiling import PhaseTimer
+
+class FrameProfiler(PhaseTimer):
+    # Times every phase of on_update/on_draw, keeps a rolling history of frame times
+    # and records Chrome trace events (chrome://tracing, Perfetto) into a ring buffer.
+    def __init__(self, history=PROFILER_HISTORY):
+        super().__init__()
+        self.frame_times = deque(maxlen=history)
+        self.events = deque(maxlen=PROFILER_MAX_TRACE_EVENTS)
+        self.origin = time.perf_counter()
+        self.frame_start = None
+        self.p50_text = arcade.Text("", 0, 0, arcade.color.WHITE, 10)
+        self.p99_text = arcade.Text("", 0, 0, arcade.color.WHITE, 10)
+        self.shown_percentiles = None
+        self.text_origin = None
+
+    def add(self, name, seconds):
+        super().add(name, seconds)
+        end = time.perf_counter()
+        self.events.append({
+            "name": name,
+            "cat": name.split(".")[0],
+            "ph": "X",
+            "ts": (end - seconds - self.origin) * 1e6,
+            "dur": seconds * 1e6,
+            "pid": 0,
+            "tid": 0,
+        })
+
+    def begin_frame(self):
+        # Frame time is measured from one on_draw to the next, so it includes vsync waits and updates
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.frame_times.append((now - self.frame_start) * 1000)
+            self.add("frame", now - self.frame_start)
+        self.frame_start = now
+
+    def percentile(self, p):
+        if not self.frame_times:
+            return 0.0
+        ordered = sorted(self.frame_times)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def dump_trace(self, path=PROFILER_TRACE_FILE):
+        with open(path, "w") as f:
+            json.dump({"traceEvents": list(self.events), "displayTimeUnit": "ms"}, f)
+        return path
+
+    def draw(self, left, bottom, width=PROFILER_GRAPH_WIDTH, height=PROFILER_GRAPH_HEIGHT):
+        # Frame time graph, scaled so the top of the graph is PROFILER_GRAPH_MAX_MS
+        arcade.draw_lrbt_rectangle_filled(left, left + width, bottom, bottom + height, (0, 0, 0, 128))
+        scale = height / PROFILER_GRAPH_MAX_MS
+        budget_y = bottom + 1000 / 60 * scale
+        arcade.draw_line(left, budget_y, left + width, budget_y, arcade.color.YELLOW, 1)
+        if len(self.frame_times) > 1:
+            step = width / (self.frame_times.maxlen - 1)
+            points = [(left + i * step, bottom + min(frame_time, PROFILER_GRAPH_MAX_MS) * scale)
+                      for i, frame_time in enumerate(self.frame_times)]
+            arcade.draw_line_strip(points, arcade.color.GREEN, 1)
+
+        # The labels are only laid out again when the shown values or their position change
+        percentiles = (round(self.percentile(50), 1), round(self.percentile(99), 1))
+        if percentiles != self.shown_percentiles:
+            self.shown_percentiles = percentiles
+            self.p50_text.text = f"p50 {percentiles[0]:.1f} ms"
+            self.p99_text.text = f"p99 {percentiles[1]:.1f} ms"
+        if (left, bottom + height) != self.text_origin:
+            self.text_origin = (left, bottom + height)
+            self.p50_text.position = (left + 4, bottom + height + 16)
+            self.p99_text.position = (left + 4, bottom + height + 2)
+        self.p50_text.draw()
+        self.p99_text.draw()
@@ -0,0 +1,49 @@
+import arcade
+import time
+from pyglet.graphics import Batch
+from constants import *
+
+class HudLabel:
+    # Text bound to a value, or a tuple of values. The text is formatted, and pyglet lays
+    # out its glyphs, only when the value changes.
+    def __init__(self, template, x, y, color, batch, value=None):
+        self.template = template
+        self.value = value
+        self.label = arcade.Text("" if value is None else self.format(value), x, y, color, HUD_FONT_SIZE, batch=batch)
+
+    def format(self, value):
+        return self.template.format(*value) if isinstance(value, tuple) else self.template.format(value)
+
+    def set(self, value):
+        if value == self.value:
+            return
+        self.value = value
+        self.label.text = self.format(value)
+
+class Hud:
+    # All HUD labels share one pyglet batch and are drawn with a single call. Labels that
+    # are switched off in the constants are kept out of the batch.
+    def __init__(self):
+        self.batch = Batch()
+        self.debug = HudLabel("{}", 0, 10, arcade.color.LIGHT_PINK, self.batch if DEBUG_DRAW else None, "Time: 0")
+        self.score = HudLabel("Score: {}", 20, SCREEN_HEIGHT - 20, arcade.color.YELLOW, self.batch, 0)
+        self.health = HudLabel("Health: {}", 650, SCREEN_HEIGHT - 20, arcade.color.GREEN, self.batch, MAX_HEALTH)
+        self.fps = HudLabel("FPS: {:.2f}", 650, 10, arcade.color.GREEN, self.batch if DRAW_FPS else None, 0)
+        self.latency = HudLabel("Input: {:.1f} ms", 480, 10, arcade.color.GREEN, self.batch if DRAW_FPS else None, 0)
+        self.pacing = HudLabel("{}", 20, 30, arcade.color.GREEN, self.batch if DRAW_FPS else None, "")
+        self.status = HudLabel("{}", 20, SCREEN_HEIGHT - 45, arcade.color.WHITE, self.batch, "")
+        self.status_until = None
+
+    def show_status(self, message):
+        # Always drawn, unlike the debug label, and cleared again after HUD_STATUS_TIME
+        self.status.set(message)
+        self.status_until = time.perf_counter() + HUD_STATUS_TIME
+
+    def update(self):
+        if self.status_until is not None and time.perf_counter() > self.status_until:
+            self.status.set("")
+            self.status_until = None
+
+    def draw(self):
+        with arcade.get_window().ctx.pyglet_rendering():
+            self.batch.draw()
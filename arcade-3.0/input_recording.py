@@ -0,0 +1,118 @@
+"""
+Recorded input sessions.
+
+The world only changes through the input it reads at the start of each tick, so a
+session is reproduced exactly by its level, view size and per-tick input:
+
+    header       magic, version, tick length, level seed, level checksum, view size
+    runs         tick count (u16), held keys (u8), actions (u8)
+
+Consecutive ticks with the same input share one run. A run with a tick count of 0 is
+a view size change instead, followed by the new width and height (u32 each).
+
+    python sopwith-arcade.py --record session.rec     # play and record
+    python sopwith-arcade.py --replay session.rec     # watch it again
+    python -m sopwith.replay session.rec              # replay without a window, under the profiler
+"""
+import struct
+import zlib
+from constants import *
+
+MAGIC = b"SOPR"
+VERSION = 1
+# magic, version, tick length, generated level, level seed, level checksum, view width, view height
+HEADER = struct.Struct("<4sIdBqIII")
+RUN = struct.Struct("<HBB")
+VIEW_SIZE = struct.Struct("<II")
+MAX_RUN = 0xFFFF
+
+def get_level_checksum(level_seed):
+    # Generated levels are fully described by their seed, level files by their bytes
+    if level_seed is not None:
+        return 0
+    with open(LEVEL_FILE, "rb") as f:
+        return zlib.crc32(f.read())
+
+class InputRecorder:
+    # Attach as world.recorder before the first tick, the world reports every tick's input
+    def __init__(self, path, world):
+        self.file = open(path, "wb")
+        level_seed = world.level_seed
+        self.file.write(HEADER.pack(MAGIC, VERSION, FIXED_TIMESTEP, level_seed is not None, level_seed or 0,
+                                    get_level_checksum(level_seed), world.view_width, world.view_height))
+        self.run = None
+        self.run_length = 0
+
+    def record(self, held, actions):
+        if (held, actions) == self.run and self.run_length < MAX_RUN:
+            self.run_length += 1
+            return
+        self.flush()
+        self.run = (held, actions)
+        self.run_length = 1
+
+    def record_view_size(self, width, height):
+        self.flush()
+        self.file.write(RUN.pack(0, 0, 0) + VIEW_SIZE.pack(int(width), int(height)))
+
+    def flush(self):
+        if self.run_length:
+            self.file.write(RUN.pack(self.run_length, *self.run))
+        self.run = None
+        self.run_length = 0
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+class InputReplay:
+    # Attach as world.replay to a World built from level_seed and view_size. Each tick
+    # it replaces the live input with the recorded one until the recording runs out.
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        if len(self.data) < HEADER.size:
+            raise ValueError(f"{path} is not a version {VERSION} input recording")
+        magic, version, timestep, generated, seed, checksum, width, height = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} input recording")
+        if timestep != FIXED_TIMESTEP:
+            raise ValueError(f"{path} was recorded with {timestep:.5f} s ticks, not {FIXED_TIMESTEP:.5f} s")
+        self.level_seed = seed if generated else None
+        if checksum != get_level_checksum(self.level_seed):
+            raise ValueError(f"{path} was recorded on a different {LEVEL_FILE}")
+        self.view_size = (width, height)
+        self.offset = HEADER.size
+        self.held = self.actions = 0
+        self.remaining = 0
+        self.tick = 0
+        self.tick_count = sum(count for count, _, _ in self.runs())
+        self.finished = self.tick_count == 0
+
+    def runs(self):
+        offset = HEADER.size
+        while offset < len(self.data):
+            count, held, actions = RUN.unpack_from(self.data, offset)
+            offset += RUN.size + (VIEW_SIZE.size if count == 0 else 0)
+            yield count, held, actions
+
+    def apply(self, world):
+        while self.remaining == 0:
+            if self.offset >= len(self.data):
+                self.finished = True
+                world.set_held_keys(0)
+                return
+            count, held, actions = RUN.unpack_from(self.data, self.offset)
+            self.offset += RUN.size
+            if count == 0:
+                world.set_view_size(*VIEW_SIZE.unpack_from(self.data, self.offset))
+                self.offset += VIEW_SIZE.size
+                continue
+            self.remaining, self.held, self.actions = count, held, actions
+
+        self.remaining -= 1
+        self.tick += 1
+        self.finished = self.tick >= self.tick_count
+        world.set_held_keys(self.held)
+        world.pending_actions = self.actions
@@ -0,0 +1,79 @@
+#version 330
+
+// Per-explosion version of multiExplosion.glsl. Each fragment only evaluates the explosion
+// whose quad it lies in, and the results are added to the scene with additive blending.
+// The pass may run at a fraction of the window resolution, given by render_scale.
+
+#define EXPLOSION_DURATION 2.
+
+const float size1_Particles = 33.0; // change particle count
+float res = 1.0; // pixel resolution
+float gravity = 0.92; // set gravity
+float scale = 1.0; // scaling factor for explosions
+
+uniform vec2 resolution;
+uniform float time;
+uniform float render_scale;
+
+flat in vec4 v_explosion; // screen position, size, start time
+
+out vec4 fragColor;
+
+vec2 Hash12_Polar(float t) {
+    float a = fract(sin(t * 674.3) * 453.2) * 6.2832;
+    float d = fract(sin((t + a) * 714.3) * 263.2);
+    return vec2(sin(a), cos(a)) * d;
+}
+
+float glowingCircle(vec2 uv, vec2 center, float time, float size) {
+    if (time > EXPLOSION_DURATION) return 0.0;
+    float normalized_time = time / EXPLOSION_DURATION;
+    float radius = (1. - pow((1. - normalized_time), 16.)) * size * 0.15;
+    float dist = length(uv - center);
+    float circle = smoothstep(radius, radius + 0.003, dist) - smoothstep(radius + 0.004, radius + 0.005, dist);
+    return circle * max(0, 1.01 - radius / (size * 0.15)); // Fade away quickly with expansion
+}
+
+float explosion(vec2 uv, float time, float size) {
+    float sparks = 0.0;
+    float particles = size1_Particles * size;
+    for (float i = 0.0; i < particles; i++) {
+        vec2 dir = Hash12_Polar(i + 1.);
+        dir.y -= (gravity / 3.) * time;
+        float d = length(uv - dir * time * 0.1 * size);
+        float brightness = mix(0.0005, 0.002, smoothstep(0.05, 0.0, time));
+        brightness *= sin(time * 20.0 + i) * 0.5 + 0.5;
+        brightness *= smoothstep(1., 0.5, time);
+        sparks += brightness / d;
+    }
+
+    return sparks;
+}
+
+void main() {
+    vec2 fragCoord = gl_FragCoord.xy / render_scale;
+    vec2 uv = fragCoord / resolution;
+
+    vec2 explodePosition = v_explosion.xy;
+    float explosionSize = v_explosion.z == 0. ? 1. : v_explosion.z / 2.;
+    float explodeTime = (time - v_explosion.w) / explosionSize;
+
+    vec2 center = explodePosition / resolution;
+    vec2 pos = (fragCoord - explodePosition) / res;
+    float dist = length(pos);
+
+    float max_dist = explosionSize * 300;
+    if (dist > max_dist) discard;
+
+    vec2 explosionCenter = (fragCoord - center * resolution) / resolution.y;
+
+    // Glowing circle around the explosion
+    vec3 glow = vec3(0.647, 0.3, 0.0) * glowingCircle(uv, center, explodeTime, explosionSize);
+
+    vec3 col = vec3(explosion(explosionCenter, explodeTime, explosionSize));
+    col *= vec3(1., smoothstep(0.647, 0.0, explodeTime / 2), smoothstep(0.3, 0.0, explodeTime / 2)); // orange to red
+    col = col * (1 - min(dist, max_dist) / max_dist);
+    col *= scale;
+
+    fragColor = vec4(glow + col, 1.0);
+}
@@ -0,0 +1,18 @@
+#version 330
+
+// One screen-space quad per explosion, just large enough to cover max_dist around it
+
+in vec2 in_vert; // unit quad corner, -1..1
+in vec4 in_explosion; // screen position, size, start time
+
+uniform vec2 resolution;
+
+flat out vec4 v_explosion;
+
+void main() {
+    float explosionSize = in_explosion.z == 0. ? 1. : in_explosion.z / 2.;
+    float max_dist = explosionSize * 300;
+    vec2 pixel = in_explosion.xy + in_vert * max_dist;
+    gl_Position = vec4(pixel / resolution * 2. - 1., 0., 1.);
+    v_explosion = in_explosion;
+}
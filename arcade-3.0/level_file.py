@@ -0,0 +1,185 @@
+"""
+Pre-baked binary level format.
+
+terrain.txt and landscape.txt are compiled into one file in native (little-endian)
+byte order that is memory-mapped at startup, so loading a level does no parsing at all:
+
+    header       magic, version, counts, chunk width and first chunk index
+    terrain      x (f64[n]), y (f64[n]), color (i8[n])
+    targets      x (f64[m]), ground y (f64[m]), texture index (u8[m])
+    chunk index  first terrain point (i32[c + 1]), first target (i32[c + 1])
+
+Every section starts on an 8 byte boundary. Chunk i covers
+[(first_chunk + i) * chunk_width, (first_chunk + i + 1) * chunk_width).
+
+    python level_file.py terrain.txt landscape.txt level.bin
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from constants import *
+from terrain_index import TerrainIndex
+
+MAGIC = b"SOPL"
+VERSION = 1
+# magic, version, point count, target count, chunk count, chunk width, first chunk
+HEADER = struct.Struct("<4sIIIIdi")
+
+def read_terrain_text(path):
+    points = []
+    with open(path) as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            x, y, color = map(int, line.split(","))
+            points.append((x, y, color))
+    return points
+
+def read_landscape_text(path):
+    targets = []
+    with open(path) as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            x, targetN = map(int, line.split(","))
+            targets.append((x, targetN))
+    return targets
+
+def compile_level(terrain_path, landscape_path, out_path, chunk_width=TERRAIN_CHUNK_WIDTH):
+    points = sorted(read_terrain_text(terrain_path))
+    terrain_index = TerrainIndex(points)
+    targets = sorted(read_landscape_text(landscape_path))
+
+    target_xs = array("d", (x for x, _ in targets))
+    target_ys = array("d", (terrain_index.height_at(x) for x, _ in targets))
+    target_textures = array("B", (targetN % len(TARGET_IMAGES) for _, targetN in targets))
+
+    xs = [x for x, _, _ in points] + list(target_xs)
+    first_chunk = int(min(xs) // chunk_width) if xs else 0
+    last_chunk = int(max(xs) // chunk_width) if xs else 0
+    chunk_count = last_chunk - first_chunk + 1
+    chunk_points = array("i")
+    chunk_targets = array("i")
+    point_i = target_i = 0
+    for chunk in range(first_chunk, last_chunk + 2):
+        start_x = chunk * chunk_width
+        while point_i < len(points) and points[point_i][0] < start_x:
+            point_i += 1
+        while target_i < len(targets) and targets[target_i][0] < start_x:
+            target_i += 1
+        chunk_points.append(point_i)
+        chunk_targets.append(target_i)
+
+    sections = [
+        terrain_index.xs, terrain_index.ys, terrain_index.colors,
+        target_xs, target_ys, target_textures,
+        chunk_points, chunk_targets,
+    ]
+    # Written next to the target and renamed over it, so a process mapping the level never sees a partial file
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(out_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(points), len(targets), chunk_count, chunk_width, first_chunk))
+            for section in sections:
+                f.write(b"\0" * (-f.tell() % 8))
+                f.write(section.tobytes())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, out_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+class LevelFile:
+    # Read-only view of a compiled level, every array is a memoryview straight into the mapped file.
+    # Close it, or use it as a context manager, once nothing holds its arrays any more.
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = data = memoryview(self.mmap)
+        self.views = []
+
+        magic, version, point_count, target_count, chunk_count, chunk_width, first_chunk = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} level file")
+        self.chunk_width = chunk_width
+        self.first_chunk = first_chunk
+        self.chunk_count = chunk_count
+
+        offset = HEADER.size
+        def section(typecode, count):
+            nonlocal offset
+            offset += -offset % 8
+            size = struct.calcsize(typecode) * count
+            view = data[offset:offset + size].cast(typecode)
+            self.views.append(view)
+            offset += size
+            return view
+
+        self.terrain_xs = section("d", point_count)
+        self.terrain_ys = section("d", point_count)
+        self.terrain_colors = section("b", point_count)
+        self.target_xs = section("d", target_count)
+        self.target_ys = section("d", target_count)
+        self.target_textures = section("B", target_count)
+        self.chunk_points = section("i", chunk_count + 1)
+        self.chunk_targets = section("i", chunk_count + 1)
+
+    def terrain_index(self):
+        return TerrainIndex.from_arrays(self.terrain_xs, self.terrain_ys, self.terrain_colors)
+
+    def targets(self):
+        return zip(self.target_xs, self.target_ys, self.target_textures)
+
+    def chunk_slice(self, offsets, chunk):
+        i = chunk - self.first_chunk
+        if i < 0 or i >= self.chunk_count:
+            return 0, 0
+        return offsets[i], offsets[i + 1]
+
+    def read_chunk(self, chunk):
+        # Targets of one chunk as (id, x, ground y, texture index). Also touches the chunk's
+        # terrain so its pages are faulted in by whichever thread reads it, not by the next tick.
+        first, last = self.chunk_slice(self.chunk_points, chunk)
+        sum(self.terrain_ys[first:last])
+        first, last = self.chunk_slice(self.chunk_targets, chunk)
+        return [(i, self.target_xs[i], self.target_ys[i], self.target_textures[i]) for i in range(first, last)]
+
+    def set_resident(self, chunks):
+        # The whole terrain stays mapped, the OS pages it in and out as needed
+        pass
+
+    def close(self):
+        # Raises BufferError if a view into the mapping, like a TerrainIndex from terrain_index(), is still alive
+        if self.mmap.closed:
+            return
+        for view in self.views:
+            view.release()
+        self.data.release()
+        self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def is_stale(level_path, *source_paths):
+    if not os.path.exists(level_path):
+        return True
+    level_time = os.path.getmtime(level_path)
+    return any(os.path.exists(path) and os.path.getmtime(path) > level_time for path in source_paths)
+
+def load_level(level_path=LEVEL_FILE, terrain_path="terrain.txt", landscape_path="landscape.txt"):
+    # Recompile only when the text sources changed since the level was baked
+    if is_stale(level_path, terrain_path, landscape_path):
+        compile_level(terrain_path, landscape_path, level_path)
+    return LevelFile(level_path)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("usage: python level_file.py terrain.txt landscape.txt level.bin")
+        sys.exit(1)
+    compile_level(*sys.argv[1:])
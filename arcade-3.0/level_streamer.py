@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from constants import *
+from target import Target
+from textures import get_texture
+
+class LevelStreamer:
+    # Keeps only the level chunks around the camera resident. Each chunk owns the targets
+    # standing on it; chunks far behind are evicted with their sprites. Target textures are
+    # shared and stay packed in the atlas. Chunks the plane is flying into are read on a
+    # background thread, so crossing a chunk border does not stall a tick.
+    def __init__(self, level, radius=STREAM_RADIUS_CHUNKS, evict_radius=STREAM_EVICT_CHUNKS):
+        self.level = level
+        self.chunk_width = level.chunk_width
+        self.radius = radius
+        self.evict_radius = max(radius, evict_radius)
+        self.chunks = {}
+        self.resident = set()
+        self.pending = {}
+        self.destroyed = set()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-streamer")
+
+    def get_chunk(self, x):
+        return int(x // self.chunk_width)
+
+    def load_chunk(self, chunk):
+        future = self.pending.pop(chunk, None)
+        records = future.result() if future else self.level.read_chunk(chunk)
+        targets = []
+        for target_id, x, y, index in records:
+            if target_id in self.destroyed:
+                continue
+            target = Target(get_texture(TARGET_IMAGES[index]), x, y)
+            target.level_id = target_id
+            targets.append(target)
+        self.chunks[chunk] = targets
+        return targets
+
+    def evict_chunk(self, chunk):
+        return self.chunks.pop(chunk)
+
+    def destroy(self, target):
+        # Destroyed targets stay destroyed when their chunk is streamed in again
+        targets = self.chunks.get(self.get_chunk(target.center_x))
+        if targets is None or target not in targets:
+            return
+        targets.remove(target)
+        self.destroyed.add(target.level_id)
+
+    def prefetch(self, x, change_x):
+        # Queue the chunks between the loaded window and where the plane will be in
+        # STREAM_PREFETCH_TICKS, in the direction it is heading
+        direction = 1 if change_x >= 0 else -1
+        center = self.get_chunk(x)
+        first = center + direction * (self.radius + 1)
+        last = self.get_chunk(x + change_x * STREAM_PREFETCH_TICKS) + direction * (self.radius + 1)
+        if (last - first) * direction < 0:
+            last = first
+        for chunk in range(first, last + direction, direction):
+            if chunk not in self.chunks and chunk not in self.pending:
+                self.pending[chunk] = self.executor.submit(self.level.read_chunk, chunk)
+
+        for chunk in [c for c in self.pending if (c - center) * direction < 0 and abs(c - center) > self.evict_radius]:
+            self.pending.pop(chunk).cancel()
+
+    def update(self, x, change_x):
+        # Returns the targets that were streamed in and the ones that were evicted
+        center = self.get_chunk(x)
+        loaded = []
+        for chunk in range(center - self.radius, center + self.radius + 1):
+            if chunk not in self.chunks:
+                loaded += self.load_chunk(chunk)
+        evicted = []
+        for chunk in [c for c in self.chunks if abs(c - center) > self.evict_radius]:
+            evicted += self.evict_chunk(chunk)
+        if loaded or evicted or self.chunks.keys() != self.resident:
+            self.resident = set(self.chunks)
+            self.level.set_resident(self.resident)
+        self.prefetch(x, change_x)
+        return loaded, evicted
+
+    def close(self):
+        # Waits for a chunk read that is already running, so the level can be closed after this
+        self.executor.shutdown(wait=True, cancel_futures=True)
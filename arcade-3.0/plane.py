@@ -2,34 +2,60 @@ import arcade
 import math
 from constants import *
 from arcade.hitbox import *
+from textures import get_texture
+
+HIT_BOX_POINTS = [
+    (-108, 3), (-115, 15), (-108, 38), (-95, 42),
+    (-78, 35), (-60, 18), (35, 28), (42, 48), (90, 50),
+    (90, 30), (105, 31), (105, 53), (110, 53), (110, -45),
+    (100, -15), (90, -15), (90, -45), (73, -56),
+    (58, -45), (50, -15)
+]
+
+def get_hit_box_points(flipped):
+    return [(x, -y) for x, y in HIT_BOX_POINTS] if flipped else HIT_BOX_POINTS
+
+def rotate_hit_box(points, scale, angle):
+    # Same transform as arcade's RotatableHitBox, relative to the center, plus the bounds
+    rad = math.radians(-angle)
+    rad_cos, rad_sin = math.cos(rad), math.sin(rad)
+    rotated = [(x * scale * rad_cos - y * scale * rad_sin, x * scale * rad_sin + y * scale * rad_cos) for x, y in points]
+    xs = [x for x, _ in rotated]
+    ys = [y for _, y in rotated]
+    return rotated, (min(xs), min(ys), max(xs), max(ys))
 
 class Plane(arcade.Sprite):
+    # Rotated hit box polygons and bounds relative to the center, keyed by (flipped, angle).
+    # The plane turns in TILT_ANGLE steps, so every shape it can fly in is computed once.
+    hit_shapes = {}
+
     def __init__(self):
-        super().__init__("plane.png", scale=PLANE_SCALE)
+        super().__init__(get_texture("plane.png"), scale=PLANE_SCALE)
         self.health = MAX_HEALTH
         self.speed = 0
         self.health = 10
         self.flipped = False
-        texture0 = arcade.load_texture("plane.png") # , hit_box_algorithm= PymunkHitBoxAlgorithm(detail=15.))
-        texture1 = texture0.flip_top_bottom() # hit_box_algorithm= PymunkHitBoxAlgorithm(detail=15.))`
-        self.textures.append(texture0)
-        self.textures.append(texture1)
+        self.textures.append(get_texture("plane.png", flipped=True))
         self.setup_hit_box()
-        
-    def setup_hit_box(self):
-        hit_box_points = [
-            (-108, 3), (-115, 15), (-108, 38), (-95, 42), 
-            (-78, 35), (-60, 18), (35, 28), (42, 48), (90, 50), 
-            (90, 30), (105, 31), (105, 53), (110, 53), (110, -45), 
-            (100, -15), (90, -15), (90, -45), (73, -56),
-            (58, -45), (50, -15)
-        ]
-        if self.flipped:
-            hit_box_points = [(x, -y) for x, y in hit_box_points]
+        if not Plane.hit_shapes:
+            for flipped in (False, True):
+                for step in range(round(360 / TILT_ANGLE)):
+                    angle = step * TILT_ANGLE
+                    Plane.hit_shapes[(flipped, angle)] = rotate_hit_box(get_hit_box_points(flipped), PLANE_SCALE, angle)
 
+    def setup_hit_box(self):
+        hit_box_points = get_hit_box_points(self.flipped)
         self.hit_box = arcade.hitbox.HitBox(points=hit_box_points, scale=(self.scale, self.scale), position=(self.center_x, self.center_y))
 
     def flip(self):
         self.flipped = not self.flipped
         self.set_texture(1 if self.flipped else 0)
         self.setup_hit_box()
+
+    def get_hit_shape(self):
+        # (points, bounds, offset): the polygon and its bounds relative to the center, and the
+        # center to add. Only angles off the TILT_ANGLE grid, like a crashing dive, are computed.
+        shape = self.hit_shapes.get((self.flipped, self.angle % 360))
+        if shape is None:
+            shape = rotate_hit_box(get_hit_box_points(self.flipped), PLANE_SCALE, self.angle)
+        return shape[0], shape[1], self.position
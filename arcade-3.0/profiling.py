@@ -0,0 +1,50 @@
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+class PhaseTimer:
+    # Accumulates wall time per named phase, e.g. world.timer = PhaseTimer()
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    def phase(self, name):
+        return TimedPhase(self, name)
+
+    def add(self, name, seconds):
+        self.totals[name] += seconds
+        self.counts[name] += 1
+
+    def wrap(self, name, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start)
+        return timed
+
+    def reset(self):
+        self.totals.clear()
+        self.counts.clear()
+
+class TimedPhase:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+        return False
+
+class NullTimer:
+    # Stand-in used when nothing is being measured, every phase is a no-op
+    def phase(self, name):
+        return NULL_PHASE
+
+NULL_PHASE = nullcontext()
+NULL_TIMER = NullTimer()
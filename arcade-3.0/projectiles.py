@@ -0,0 +1,156 @@
+import numpy as np
+from constants import *
+
+KIND_BULLET = 0
+KIND_BOMB = 1
+KIND_TARGET_BULLET = 2
+
+class SpritePool:
+    # Preallocated sprites of one projectile type. Released sprites are handed out again by
+    # acquire(), so sustained fire allocates nothing. When cap sprites are in flight, acquire()
+    # returns None and the shot is dropped.
+    def __init__(self, factory, cap):
+        self.factory = factory
+        self.cap = cap
+        self.free = [factory() for _ in range(cap)]
+        self.in_use = 0
+
+    def acquire(self):
+        if self.in_use >= self.cap:
+            return None
+        self.in_use += 1
+        return self.free.pop() if self.free else self.factory()
+
+    def release(self, sprite):
+        self.in_use -= 1
+        self.free.append(sprite)
+
+class ProjectilePool:
+    # Struct-of-arrays state for every bullet, bomb and target bullet in flight.
+    # The sprites only mirror the arrays for drawing and narrow-phase collision,
+    # and are written back only while they are inside the visible window.
+    def __init__(self, capacity=PROJECTILE_POOL_CAPACITY, sprite_pools=None):
+        self.sprite_pools = sprite_pools or {}
+        self.capacity = 0
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.prev_x = np.zeros(0)
+        self.prev_y = np.zeros(0)
+        self.change_x = np.zeros(0)
+        self.change_y = np.zeros(0)
+        self.angle = np.zeros(0)
+        self.half_height = np.zeros(0)
+        self.start_time = np.zeros(0)
+        self.alpha = np.zeros(0)
+        self.kind = np.zeros(0, dtype=np.int8)
+        self.alive = np.zeros(0, dtype=bool)
+        self.visible = np.zeros(0, dtype=bool)
+        self.sprites = []
+        self.free_slots = []
+        self.grow(capacity)
+
+    def grow(self, capacity):
+        extra = capacity - self.capacity
+        for name in ("x", "y", "prev_x", "prev_y", "change_x", "change_y", "angle", "half_height", "start_time", "alpha", "kind", "alive", "visible"):
+            values = getattr(self, name)
+            setattr(self, name, np.concatenate((values, np.zeros(extra, dtype=values.dtype))))
+        self.sprites += [None] * extra
+        self.free_slots += range(capacity - 1, self.capacity - 1, -1)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.capacity - len(self.free_slots)
+
+    def add(self, sprite, kind, time):
+        if not self.free_slots:
+            self.grow(self.capacity * 2)
+        slot = self.free_slots.pop()
+        self.x[slot], self.y[slot] = sprite.position
+        self.prev_x[slot], self.prev_y[slot] = sprite.position
+        self.change_x[slot] = sprite.change_x
+        self.change_y[slot] = sprite.change_y
+        self.angle[slot] = sprite.angle
+        self.half_height[slot] = sprite.height / 2
+        self.start_time[slot] = time
+        self.alpha[slot] = 255
+        self.kind[slot] = kind
+        self.alive[slot] = True
+        self.visible[slot] = True
+        self.sprites[slot] = sprite
+        sprite.pool_slot = slot
+        return slot
+
+    def acquire(self, kind):
+        sprite_pool = self.sprite_pools.get(kind)
+        return sprite_pool.acquire() if sprite_pool is not None else None
+
+    def remove(self, sprite):
+        slot = sprite.pool_slot
+        if slot is None or self.sprites[slot] is not sprite:
+            return
+        self.alive[slot] = False
+        self.visible[slot] = False
+        self.sprites[slot] = None
+        self.free_slots.append(slot)
+        sprite.pool_slot = None
+        # Leaving the lists frees the sprite's buffer slot, the next sprite appended reuses it
+        sprite.remove_from_sprite_lists()
+        sprite_pool = self.sprite_pools.get(self.kind[slot])
+        if sprite_pool is not None:
+            sprite_pool.release(sprite)
+
+    def slots(self, kind):
+        return np.flatnonzero(self.alive & (self.kind == kind))
+
+    def step(self, delta_time, time):
+        # Advance every live projectile one tick and return the sprites that expired
+        alive = self.alive
+        bullets = alive & (self.kind == KIND_BULLET)
+        bombs = alive & (self.kind == KIND_BOMB)
+        target_bullets = alive & (self.kind == KIND_TARGET_BULLET)
+        age = time - self.start_time
+
+        expired = np.flatnonzero(target_bullets & (age >= BULLET_FADE_TIME_TARGET))
+        target_bullets[expired] = False
+        moving = bullets | bombs | target_bullets
+
+        gravity = GRAVITY * delta_time
+        # Air resistance only acts on the y velocity of plane bullets to simulate the gravity effect
+        self.change_y[bullets] = (self.change_y[bullets] + gravity) * AIR_RESISTANCE
+        self.change_y[bombs] += gravity
+        self.change_x[bombs | target_bullets] *= AIR_RESISTANCE
+        self.change_y[target_bullets] = self.change_y[target_bullets] * AIR_RESISTANCE + gravity
+
+        # Bombs tilt towards pointing straight down
+        angle = (self.angle[bombs] + 360) % 360
+        self.angle[bombs] = np.where(angle > 180, np.minimum(360, angle + 45.0 * delta_time), np.maximum(0., angle - 45.0 * delta_time))
+
+        self.prev_x[moving] = self.x[moving]
+        self.prev_y[moving] = self.y[moving]
+        self.x[moving] += self.change_x[moving]
+        self.y[moving] += self.change_y[moving]
+
+        self.alpha[bullets] = self.fade_alpha(age[bullets] / BULLET_FADE_TIME_PLANE)
+        self.alpha[target_bullets] = self.fade_alpha(age[target_bullets] / BULLET_FADE_TIME_TARGET)
+
+        return [self.sprites[slot] for slot in expired]
+
+    def fade_alpha(self, normalized_time):
+        return np.maximum(1, 255 - 255 * normalized_time ** 8)
+
+    def sync(self, left, right, alpha=1.0):
+        # Write positions back to the sprites inside [left, right] only.
+        # alpha < 1 places them between the previous and the current tick for drawing.
+        self.visible = self.alive & (self.x >= left) & (self.x <= right)
+        for slot in np.flatnonzero(self.visible):
+            self.sync_slot(slot, alpha)
+
+    def sync_slot(self, slot, alpha=1.0):
+        sprite = self.sprites[slot]
+        x = self.prev_x[slot] + (self.x[slot] - self.prev_x[slot]) * alpha
+        y = self.prev_y[slot] + (self.y[slot] - self.prev_y[slot]) * alpha
+        sprite.position = (float(x), float(y))
+        if self.kind[slot] == KIND_BOMB:
+            sprite.angle = float(self.angle[slot])
+        else:
+            sprite.alpha = int(self.alpha[slot])
@@ -1,49 +1,195 @@
 import arcade
-from arcade.experimental import Shadertoy
+import hashlib
+import time as clock
+from array import array
+from collections import OrderedDict
+from arcade.gl import BufferDescription
 from constants import *
 
+BLIT_VERTEX_SHADER = """
+#version 330
+in vec2 in_vert;
+in vec2 in_uv;
+out vec2 uv;
+void main() {
+    gl_Position = vec4(in_vert, 0., 1.);
+    uv = in_uv;
+}
+"""
+
+BLIT_FRAGMENT_SHADER = """
+#version 330
+uniform sampler2D scene;
+in vec2 uv;
+out vec4 fragColor;
+void main() {
+    fragColor = texture(scene, uv);
+}
+"""
+
+programs = {}
+
+def get_program(ctx, vertex_shader, fragment_shader):
+    # Compiled programs are shared by source hash, so nothing is compiled twice
+    key = hashlib.sha1(f"{vertex_shader}\0{fragment_shader}".encode()).hexdigest()
+    program = programs.get(key)
+    if program is None:
+        program = ctx.program(vertex_shader=vertex_shader, fragment_shader=fragment_shader)
+        programs[key] = program
+    return program
+
+def read_source(path):
+    with open(path) as file:
+        return file.read()
+
 class ShaderManager:
-    def __init__(self, window_size):
+    # The scene is drawn into channel0, copied to the screen, and every active explosion is
+    # then drawn on top as one instance of a quad covering only the area it can light up.
+    # Per-explosion data lives in a GPU buffer, so there is no fixed limit on explosions.
+    # Below scale 1 the explosions render into a smaller framebuffer that is upscaled
+    # bilinearly onto the scene. In adaptive mode the scale follows the frame time.
+    # Resizing reuses pooled framebuffers and waits for bursts of resize events to settle.
+    def __init__(self, window_size, scale=EXPLOSION_RENDER_SCALE, adaptive=EXPLOSION_ADAPTIVE_SCALE):
+        self.ctx = arcade.get_window().ctx
+        self.blit_program = get_program(self.ctx, BLIT_VERTEX_SHADER, BLIT_FRAGMENT_SHADER)
+        self.screen_quad = arcade.gl.geometry.quad_2d_fs()
+        self.explosion_program = get_program(self.ctx,
+            read_source("instancedExplosion.vert.glsl"),
+            read_source("instancedExplosion.frag.glsl"))
+        self.capacity = EXPLOSION_INSTANCE_CAPACITY
+        self.instance_buffer = self.ctx.buffer(reserve=self.capacity * EXPLOSION_INSTANCE_SIZE)
+        self.explosion_quads = self.ctx.geometry([
+            BufferDescription(self.ctx.buffer(data=array("f", [-1, -1, 1, -1, -1, 1, 1, 1])), "2f", ["in_vert"]),
+            BufferDescription(self.instance_buffer, "4f", ["in_explosion"], instanced=True),
+        ], mode=self.ctx.TRIANGLE_STRIP)
+        self.scale = scale
+        self.adaptive = adaptive
+        self.frame_time = None
+        self.last_render_time = None
+        self.slow_frames = 0
+        self.fast_frames = 0
+        self.framebuffers = OrderedDict()
+        self.resolution = None
+        self.pending_resolution = None
+        self.last_resize_time = None
         self.set_resolution(window_size)
 
+    def get_framebuffer(self, size, linear=False):
+        # Framebuffers by size and filter, only the FRAMEBUFFER_POOL_SIZE most recent are kept
+        key = (size, linear)
+        framebuffer = self.framebuffers.get(key)
+        if framebuffer is None:
+            texture = self.ctx.texture(size, components=4)
+            if linear:
+                texture.filter = self.ctx.LINEAR, self.ctx.LINEAR
+            framebuffer = self.ctx.framebuffer(color_attachments=[texture])
+            self.framebuffers[key] = framebuffer
+            if len(self.framebuffers) > FRAMEBUFFER_POOL_SIZE:
+                self.framebuffers.popitem(last=False)
+        else:
+            self.framebuffers.move_to_end(key)
+        return framebuffer
+
     def set_resolution(self, window_size):
-        self.shadertoy = Shadertoy.create_from_file(window_size, "multiExplosion.glsl")
+        window_size = tuple(window_size)
+        if window_size == self.resolution:
+            return
+        self.resolution = window_size
+        self.channel0 = self.get_framebuffer(window_size)
+        self.set_scale(self.scale)
 
-        self.channel0 = self.shadertoy.ctx.framebuffer(
-            color_attachments=[self.shadertoy.ctx.texture(window_size, components=4)]
-        )
-        self.channel1 = self.shadertoy.ctx.framebuffer(
-            color_attachments=[self.shadertoy.ctx.texture(window_size, components=4)]
-        )
+    def resize(self, window_size, now=None):
+        # The first event of a burst is applied at once, so a fullscreen toggle is immediate.
+        # Later ones wait in pending_resolution until apply_resize sees the burst has settled.
+        now = clock.perf_counter() if now is None else now
+        if self.last_resize_time is None or now - self.last_resize_time > RESIZE_DEBOUNCE:
+            self.pending_resolution = None
+            self.set_resolution(window_size)
+        else:
+            self.pending_resolution = tuple(window_size)
+        self.last_resize_time = now
 
-        self.shadertoy.channel_0 = self.channel0.color_attachments[0]
-        self.shadertoy.channel_1 = self.channel1.color_attachments[0]
+    def apply_resize(self, now=None):
+        if self.pending_resolution is None:
+            return
+        now = clock.perf_counter() if now is None else now
+        if now - self.last_resize_time >= RESIZE_DEBOUNCE:
+            self.set_resolution(self.pending_resolution)
+            self.pending_resolution = None
 
-    def render(self, time, explosions, camera: arcade.camera.Camera2D):
-        delayed_explosions = [exp for exp in explosions if time - exp.start_time < 0]  
-        active_explosions = [exp for exp in explosions if 0 <= time - exp.start_time <= EXPLOSION_DURATION]
+    def set_scale(self, scale):
+        self.scale = scale
+        self.explosion_fbo = None
+        if scale < 1:
+            size = max(1, int(self.resolution[0] * scale)), max(1, int(self.resolution[1] * scale))
+            self.explosion_fbo = self.get_framebuffer(size, linear=True)
 
-        for exp in active_explosions:
-            exp.position = camera.project(exp.orig_position)
-        
-        positions = [exp.position for exp in active_explosions]
-        sizes = [exp.size for exp in active_explosions]
-        times = [exp.start_time for exp in active_explosions]
+    def update_scale(self):
+        # Track the time between frames that draw explosions and step through
+        # EXPLOSION_RENDER_SCALES, down quickly when over budget and back up slowly
+        now = clock.perf_counter()
+        if self.last_render_time is not None:
+            frame_time = now - self.last_render_time
+            self.frame_time = frame_time if self.frame_time is None else self.frame_time * 0.9 + frame_time * 0.1
+        self.last_render_time = now
+        if self.frame_time is None:
+            return
 
-        positions_flat = [coord for pos in positions for coord in pos] + [0.0, 0.0] * (10 - len(positions))
-        sizes_array = sizes + [0.0] * (10 - len(times))
-        times_array = times + [0.0] * (10 - len(times))
-        num_explosions = len(active_explosions)
+        self.slow_frames = self.slow_frames + 1 if self.frame_time > EXPLOSION_FRAME_BUDGET else 0
+        self.fast_frames = self.fast_frames + 1 if self.frame_time < EXPLOSION_FRAME_BUDGET * EXPLOSION_SCALE_UP_HEADROOM else 0
+        scales = EXPLOSION_RENDER_SCALES
+        step = scales.index(self.scale) if self.scale in scales else 0
+        if self.slow_frames >= EXPLOSION_SCALE_DOWN_FRAMES and step < len(scales) - 1:
+            step += 1
+        elif self.fast_frames >= EXPLOSION_SCALE_UP_FRAMES and step > 0:
+            step -= 1
+        else:
+            return
+        self.slow_frames = self.fast_frames = 0
+        self.set_scale(scales[step])
 
-        active_explosions += delayed_explosions
+    def render(self, time, explosions, camera: arcade.camera.Camera2D):
+        instances, count = pack_explosion_instances(time, explosions, camera)
 
-        positions_tuple = tuple(positions_flat)
-        sizes_tuple = tuple(sizes_array)
-        times_tuple = tuple(times_array)
+        self.channel0.color_attachments[0].use(0)
+        self.blit_program["scene"] = 0
+        self.screen_quad.render(self.blit_program)
+        if count == 0:
+            # Frames without explosions say nothing about their cost
+            self.last_render_time = None
+            return
+        if self.adaptive:
+            self.update_scale()
 
-        self.shadertoy.program["explodePositions"] = positions_tuple
-        self.shadertoy.program["explosionSizes"] = sizes_tuple
-        self.shadertoy.program["explodeTimes"] = times_tuple
-        self.shadertoy.program["numExplosions"] = num_explosions
+        if count > self.capacity:
+            while count > self.capacity:
+                self.capacity *= 2
+            self.instance_buffer.orphan(size=self.capacity * EXPLOSION_INSTANCE_SIZE)
+        self.instance_buffer.write(instances)
 
-        self.shadertoy.render(time=time)
\ No newline at end of file
+        self.explosion_program["resolution"] = self.resolution
+        self.explosion_program["time"] = time
+        self.explosion_program["render_scale"] = self.scale
+        blend_func = self.ctx.blend_func
+        with self.ctx.enabled(self.ctx.BLEND):
+            self.ctx.blend_func = self.ctx.BLEND_ADDITIVE
+            if self.explosion_fbo is None:
+                self.explosion_quads.render(self.explosion_program, instances=count)
+            else:
+                with self.explosion_fbo.activate():
+                    self.explosion_fbo.clear()
+                    self.explosion_quads.render(self.explosion_program, instances=count)
+                self.explosion_fbo.color_attachments[0].use(0)
+                self.screen_quad.render(self.blit_program)
+        self.ctx.blend_func = blend_func
+
+def pack_explosion_instances(time, explosions, camera: arcade.camera.Camera2D):
+    # (screen x, screen y, size, start time) per active explosion, as float32
+    instances = array("f")
+    count = 0
+    for exp in explosions:
+        if 0 <= time - exp.start_time <= EXPLOSION_DURATION:
+            exp.position = camera.project(exp.orig_position)
+            instances.extend((exp.position[0], exp.position[1], exp.size, exp.start_time))
+            count += 1
+    return instances, count
@@ -0,0 +1,8 @@
+import os
+import sys
+
+def use_offscreen_if_no_display():
+    # Call before arcade is imported. With no display to open, pyglet creates an
+    # offscreen context instead.
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        os.environ.setdefault("ARCADE_HEADLESS", "1")
@@ -0,0 +1,78 @@
+"""
+Replays a recorded session without a window, tick for tick, under the phase timer.
+
+Run from the arcade-3.0 directory, on a recording made with --record:
+
+    python -m sopwith.replay session.rec                        # per-subsystem timings of the whole session
+    python -m sopwith.replay session.rec --first 3000 --last 3600  # only time the ticks of one fight
+    python -m sopwith.replay session.rec --slowest 10           # also list the slowest ticks
+"""
+from sopwith import use_offscreen_if_no_display
+use_offscreen_if_no_display()
+
+import argparse
+import heapq
+import time
+from input_recording import InputReplay
+from profiling import NULL_TIMER, PhaseTimer
+from world import World
+
+def replay(path, first=0, last=None, slowest=0):
+    recording = InputReplay(path)
+    world = World(recording.view_size, recording.level_seed)
+    world.setup()
+    world.replay = recording
+    last = recording.tick_count if last is None else min(last, recording.tick_count)
+
+    timer = PhaseTimer()
+    tick_times = []
+    elapsed = 0.0
+    while not recording.finished and world.tick_count < last:
+        # tick_count is the number of the tick about to run, counting from 0
+        timed = world.tick_count >= first
+        world.timer = timer if timed else NULL_TIMER
+        start = time.perf_counter()
+        world.tick()
+        if timed:
+            seconds = time.perf_counter() - start
+            elapsed += seconds
+            tick_times.append((seconds, world.tick_count - 1))
+
+    ticks = len(tick_times)
+    result = {
+        "ticks": ticks,
+        "seconds": elapsed,
+        "phases_us_per_tick": {name: total / max(ticks, 1) * 1e6 for name, total in sorted(timer.totals.items())},
+        "slowest": heapq.nlargest(slowest, tick_times),
+        "tick_count": world.tick_count,
+        "score": world.score,
+        "health": world.plane.health,
+        "plane": world.plane.position,
+    }
+    world.close()
+    return result
+
+def print_report(result):
+    x, y = result["plane"]
+    print(f"replayed to tick {result['tick_count']}: score {result['score']}, health {result['health']}, plane at ({x:.2f}, {y:.2f})")
+    ticks = result["ticks"]
+    print(f"timed {ticks} ticks, {ticks / max(result['seconds'], 1e-9):.0f} ticks/s")
+    print("mean us/tick per subsystem:")
+    for name, mean in result["phases_us_per_tick"].items():
+        print(f"  {name:12} {mean:9.1f}")
+    if result["slowest"]:
+        print("slowest ticks:")
+        for seconds, tick in result["slowest"]:
+            print(f"  tick {tick:7} {seconds * 1e6:9.1f} us")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded session without a window")
+    parser.add_argument("recording")
+    parser.add_argument("--first", type=int, default=0, help="first tick to time, earlier ticks are replayed untimed")
+    parser.add_argument("--last", type=int, help="stop after this many ticks")
+    parser.add_argument("--slowest", type=int, default=0, help="list this many of the slowest timed ticks")
+    args = parser.parse_args()
+    print_report(replay(args.recording, args.first, args.last, args.slowest))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Headless batch simulation of the game logic, for throughput benchmarks and bot play.
+
+Run from the arcade-3.0 directory (levels and textures are loaded relative to it):
+
+    python -m sopwith.sim --episodes 8 --ticks 3600 --policy random --workers 4
+"""
+from sopwith import use_offscreen_if_no_display
+use_offscreen_if_no_display()
+
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from profiling import PhaseTimer
+from input_recording import InputRecorder
+from level_file import load_level
+from world import World, ACTION_ACCELERATE, ACTION_BOMB, ACTION_FIRE
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+class RandomPolicy:
+    # Mashes keys at random, but keeps the plane moving
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+
+    def act(self, world):
+        if world.plane.speed < PLANE_CRUISE_SPEED:
+            world.queue_action(ACTION_ACCELERATE)
+        world.up_pressed = self.random.random() < 0.3
+        world.down_pressed = not world.up_pressed and self.random.random() < 0.2
+        if self.random.random() < 0.15:
+            world.queue_action(ACTION_FIRE)
+        if self.random.random() < 0.03:
+            world.queue_action(ACTION_BOMB)
+
+class ScriptedPolicy:
+    # Holds a cruise altitude over the terrain, fires steadily and drops bombs at an interval
+    def __init__(self, seed):
+        self.altitude = 250 + seed % 100
+
+    def act(self, world):
+        plane = world.plane
+        if plane.speed < PLANE_CRUISE_SPEED:
+            world.queue_action(ACTION_ACCELERATE)
+        climb = plane.center_y < world.terrain_index.height_at(plane.center_x) + self.altitude
+        angle = ((plane.angle + 180) % 360) - 180
+        world.up_pressed = climb and angle > -20
+        world.down_pressed = not climb and angle < 15
+        if world.tick_count % 7 == 0:
+            world.queue_action(ACTION_FIRE)
+        if world.tick_count % 40 == 0:
+            world.queue_action(ACTION_BOMB)
+
+POLICIES = {"random": RandomPolicy, "scripted": ScriptedPolicy}
+PLANE_CRUISE_SPEED = 5
+
+def run_episode(episode, ticks, policy_name, seed, trace_memory=False, level_seed=None, record=None):
+    if trace_memory:
+        tracemalloc.start()
+    world = World(level_seed=level_seed)
+    world.setup()
+    if record:
+        world.recorder = InputRecorder(os.path.join(record, f"episode-{episode}.rec"), world)
+    policy = POLICIES[policy_name](seed + episode)
+
+    timer = PhaseTimer()
+    world.timer = timer
+    terrain = world.terrain_index
+    terrain.height_at = timer.wrap("terrain", terrain.height_at)
+    terrain.heights_at = timer.wrap("terrain", terrain.heights_at)
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        with timer.phase("policy"):
+            policy.act(world)
+        world.tick()
+    elapsed = time.perf_counter() - start
+    if world.recorder is not None:
+        world.recorder.close()
+    targets_destroyed = len(world.streamer.destroyed)
+    # The timing wrappers refer back to the terrain index, drop them so it is freed and its level can close
+    del terrain.height_at, terrain.heights_at, terrain
+    world.close()
+
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    elif resource is not None:
+        # ru_maxrss is in kilobytes on Linux
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    else:
+        peak_memory = None
+
+    return {
+        "episode": episode,
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_second": ticks / elapsed,
+        "phases_us_per_tick": {name: total / ticks * 1e6 for name, total in sorted(timer.totals.items())},
+        "peak_memory": peak_memory,
+        "score": world.score,
+        "targets_destroyed": targets_destroyed,
+    }
+
+def run(episodes, ticks, policy_name, seed, workers, trace_memory=False, level_seed=None, record=None):
+    args = [(episode, ticks, policy_name, seed, trace_memory, level_seed, record) for episode in range(episodes)]
+    if workers <= 1:
+        return [run_episode(*a) for a in args]
+    if level_seed is None:
+        # Bake the level file here, so the workers only ever map a finished one
+        load_level().close()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_episode, *zip(*args)))
+
+def print_report(results):
+    for result in results:
+        memory = result["peak_memory"]
+        memory = f"{memory / 2 ** 20:.1f} MiB" if memory is not None else "n/a"
+        print(f"episode {result['episode']}: {result['ticks_per_second']:.0f} ticks/s, "
+              f"score {result['score']}, targets destroyed {result['targets_destroyed']}, peak memory {memory}")
+    phases = sorted({name for result in results for name in result["phases_us_per_tick"]})
+    print("mean us/tick per subsystem (terrain queries are also counted in collisions and crash):")
+    for name in phases:
+        mean = sum(result["phases_us_per_tick"].get(name, 0) for result in results) / len(results)
+        print(f"  {name:12} {mean:9.1f}")
+    total_ticks = sum(result["ticks"] for result in results)
+    total_seconds = sum(result["seconds"] for result in results)
+    print(f"overall: {total_ticks / total_seconds:.0f} ticks/s per worker")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run game episodes without a window")
+    parser.add_argument("--episodes", type=int, default=4)
+    parser.add_argument("--ticks", type=int, default=3600, help="ticks per episode (60 ticks = 1 s of game time)")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="scripted")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--trace-memory", action="store_true", help="report the tracemalloc peak instead of the process RSS")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--level-seed", type=int, help="fly an endless level generated from this seed instead of level.bin")
+    parser.add_argument("--record", metavar="DIR", help="record each episode's input to DIR/episode-N.rec for sopwith.replay")
+    args = parser.parse_args()
+
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+    results = run(args.episodes, args.ticks, args.policy, args.seed, args.workers, args.trace_memory, args.level_seed, args.record)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+from constants import *
+
+class TargetActivationIndex:
+    # Targets bucketed by x, so each tick only the targets in the buckets around
+    # the plane are range checked and get to fire. Targets further away cost nothing.
+    def __init__(self, bucket_width=TARGET_BUCKET_WIDTH):
+        self.bucket_width = bucket_width
+        self.buckets = {}
+
+    def get_bucket(self, x):
+        return int(x // self.bucket_width)
+
+    def add(self, target):
+        target.activation_bucket = self.get_bucket(target.center_x)
+        self.buckets.setdefault(target.activation_bucket, []).append(target)
+
+    def remove(self, target):
+        bucket = self.buckets.get(target.activation_bucket)
+        if bucket is not None and target in bucket:
+            bucket.remove(target)
+            if not bucket:
+                del self.buckets[target.activation_bucket]
+
+    def get_active(self, x, radius):
+        targets = []
+        for index in range(self.get_bucket(x - radius), self.get_bucket(x + radius) + 1):
+            bucket = self.buckets.get(index)
+            if bucket:
+                targets += bucket
+        return targets
@@ -0,0 +1,34 @@
+import numpy as np
+from constants import *
+
+# Target bullets as ProjectilePool.step integrates them: each tick drag scales both
+# velocity components, gravity is added to vy and the bullet moves. Launched with unit
+# velocity, a bullet has moved REACH[n - 1] along it after n ticks and fallen FALL[n - 1].
+TICKS = np.arange(1, TARGET_BULLET_TICKS + 1, dtype=float)
+REACH = AIR_RESISTANCE * (1 - AIR_RESISTANCE ** TICKS) / (1 - AIR_RESISTANCE)
+FALL = GRAVITY * FIXED_TIMESTEP * (TICKS - REACH) / (1 - AIR_RESISTANCE)
+
+def solve_intercepts(x, y, plane_position, plane_velocity, speed=BULLET_SPEED):
+    # Firing angles for bullets from every (x, y) to meet a plane that keeps its velocity.
+    # Returns the angles in degrees, the ticks until impact and a mask of the shooters that
+    # can hit the plane at all before their bullet fades.
+    x = np.asarray(x, dtype=float)[:, None]
+    y = np.asarray(y, dtype=float)[:, None]
+    dx = plane_position[0] + plane_velocity[0] * TICKS - x
+    dy = plane_position[1] + plane_velocity[1] * TICKS - y - FALL
+    # Positive while the plane is still out of reach, the first tick it is not is the intercept
+    gap = dx * dx + dy * dy - (speed * REACH) ** 2
+    hit = gap <= 0
+    valid = hit.any(axis=1)
+    after = hit.argmax(axis=1)
+    before = np.maximum(after - 1, 0)
+
+    # Interpolate between the ticks either side of the sign change for the exact time
+    rows = np.arange(len(after))
+    gap_before, gap_after = gap[rows, before], gap[rows, after]
+    t = np.where(after > 0, gap_before / np.maximum(gap_before - gap_after, 1e-9), 1.0)
+    aim_x = dx[rows, before] + (dx[rows, after] - dx[rows, before]) * t
+    aim_y = dy[rows, before] + (dy[rows, after] - dy[rows, before]) * t
+    angles = np.degrees(np.arctan2(aim_y, aim_x))
+    ticks = TICKS[before] + (TICKS[after] - TICKS[before]) * t
+    return angles, ticks, valid
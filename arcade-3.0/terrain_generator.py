@@ -0,0 +1,122 @@
+"""
+Seeded procedural terrain.
+
+Any chunk of terrain, with its color bands and targets, is synthesized from the seed and
+the chunk index alone, so chunks can be generated lazily, in any order and on any thread,
+and the same seed always gives the same level.
+
+    python terrain_generator.py SEED FIRST_CHUNK LAST_CHUNK    # write terrain.txt and landscape.txt
+"""
+import random
+import sys
+from array import array
+from constants import *
+from terrain_index import TerrainIndex
+
+class TerrainGenerator:
+    def __init__(self, seed, chunk_width=TERRAIN_CHUNK_WIDTH):
+        self.seed = seed
+        self.chunk_width = chunk_width
+
+    def random(self, chunk, stream):
+        # str seeds are hashed with SHA-512, so this does not depend on PYTHONHASHSEED
+        return random.Random(f"{self.seed}:{chunk}:{stream}")
+
+    def on_runway(self, x):
+        return RUNWAY_START_X <= x <= RUNWAY_END_X
+
+    def edge_height(self, chunk):
+        # Height at the start of a chunk. The previous chunk ends on it, so chunks join without steps.
+        if self.on_runway(chunk * self.chunk_width):
+            return RUNWAY_HEIGHT
+        return self.random(chunk, "edge").randint(TERRAIN_MIN_HEIGHT, TERRAIN_MAX_HEIGHT)
+
+    def terrain(self, chunk):
+        # Contour points from the chunk start up to, not including, the next chunk's start
+        rng = self.random(chunk, "terrain")
+        x0 = chunk * self.chunk_width
+        x1 = x0 + self.chunk_width
+        y0 = self.edge_height(chunk)
+        y1 = self.edge_height(chunk + 1)
+        points = [(x0, y0, rng.randint(0, TERRAIN_BAND_COUNT - 1))]
+        x = x0 + rng.randint(TERRAIN_STEP_MIN, TERRAIN_STEP_MAX)
+        while x < x1:
+            # Jitter around the line between the two edges, like the old random walk
+            y = y0 + (y1 - y0) * (x - x0) / self.chunk_width + rng.randint(-TERRAIN_JITTER, TERRAIN_JITTER)
+            y = min(max(int(y), TERRAIN_MIN_HEIGHT), TERRAIN_MAX_HEIGHT)
+            if self.on_runway(x):
+                y = RUNWAY_HEIGHT
+            points.append((x, y, rng.randint(0, TERRAIN_BAND_COUNT - 1)))
+            x += rng.randint(TERRAIN_STEP_MIN, TERRAIN_STEP_MAX)
+        return points
+
+    def targets(self, chunk, points):
+        # Targets as (x, ground y, texture index), at most one per TARGET_SPACING slot
+        rng = self.random(chunk, "targets")
+        x0 = chunk * self.chunk_width
+        x1 = x0 + self.chunk_width
+        slots = self.chunk_width // TARGET_SPACING
+        count = min(slots, rng.randint(TARGETS_PER_CHUNK_MIN, TARGETS_PER_CHUNK_MAX))
+        index = TerrainIndex(points + [(x1, self.edge_height(chunk + 1), 0)])
+        targets = []
+        for slot in sorted(rng.sample(range(slots), count)):
+            x = x0 + slot * TARGET_SPACING + rng.randint(0, TARGET_SPACING // 2)
+            texture = rng.randrange(len(TARGET_IMAGES))
+            if x - RUNWAY_END_X >= TARGET_RUNWAY_CLEARANCE or RUNWAY_START_X - x >= TARGET_RUNWAY_CLEARANCE:
+                targets.append((x, index.height_at(x), texture))
+        return targets
+
+    def generate(self, chunk):
+        points = self.terrain(chunk)
+        return points, self.targets(chunk, points)
+
+class GeneratedLevel:
+    # Level source for endless play, with the same chunk interface as LevelFile.
+    # Only the terrain of the chunks the streamer keeps resident is indexed, so memory
+    # stays flat however far the plane flies.
+    def __init__(self, seed, chunk_width=TERRAIN_CHUNK_WIDTH):
+        self.generator = TerrainGenerator(seed, chunk_width)
+        self.chunk_width = chunk_width
+        self.chunk_terrain = {}
+        self.index = TerrainIndex([])
+
+    def terrain_index(self):
+        return self.index
+
+    def read_chunk(self, chunk):
+        # Runs on the streamer's worker thread, target ids are (chunk, n)
+        _, targets = self.generator.generate(chunk)
+        return [((chunk, i), x, y, texture) for i, (x, y, texture) in enumerate(targets)]
+
+    def set_resident(self, chunks):
+        # Rebuild the shared terrain index in place from the resident chunks only
+        self.chunk_terrain = {chunk: self.chunk_terrain.get(chunk) or self.generator.terrain(chunk) for chunk in chunks}
+        points = [point for chunk in sorted(self.chunk_terrain) for point in self.chunk_terrain[chunk]]
+        self.index.set_arrays(
+            array("d", (x for x, _, _ in points)),
+            array("d", (y for _, y, _ in points)),
+            array("b", (c for _, _, c in points)))
+
+    def close(self):
+        pass
+
+def write_level_text(seed, first_chunk, last_chunk, terrain_path="terrain.txt", landscape_path="landscape.txt"):
+    # Bake a stretch of generated terrain into the text files level_file.py compiles
+    generator = TerrainGenerator(seed)
+    with open(terrain_path, "w") as terrain_file, open(landscape_path, "w") as landscape_file:
+        terrain_file.write("# Each line contains x, y coordinates defining the terrain contour\n")
+        landscape_file.write("# Each line contains x coordinate of a target and target number from 0 to 4\n")
+        for chunk in range(first_chunk, last_chunk + 1):
+            points, targets = generator.generate(chunk)
+            for x, y, c in points:
+                terrain_file.write(f"{x}, {y}, {c}\n")
+            for x, _, texture in targets:
+                landscape_file.write(f"{int(x)}, {texture}\n")
+        x = (last_chunk + 1) * generator.chunk_width
+        terrain_file.write(f"{x}, {generator.edge_height(last_chunk + 1)}, 0\n")
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("usage: python terrain_generator.py SEED FIRST_CHUNK LAST_CHUNK")
+        sys.exit(1)
+    write_level_text(*map(int, sys.argv[1:]))
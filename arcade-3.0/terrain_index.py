@@ -0,0 +1,66 @@
+import bisect
+from array import array
+import numpy as np
+
+class TerrainIndex:
+    # Terrain contour stored as parallel x/y/color arrays sorted by x.
+    # Scalar queries bisect the x array, bulk queries go through NumPy views of the same memory.
+    def __init__(self, terrain_points):
+        self.set_arrays(
+            array("d", (x for x, _, _ in terrain_points)),
+            array("d", (y for _, y, _ in terrain_points)),
+            array("b", (c for _, _, c in terrain_points)))
+
+    @classmethod
+    def from_arrays(cls, xs, ys, colors):
+        # Wrap existing buffers, e.g. memoryviews into a mapped level file, without copying
+        index = cls.__new__(cls)
+        index.set_arrays(xs, ys, colors)
+        return index
+
+    def set_arrays(self, xs, ys, colors):
+        self.xs = xs
+        self.ys = ys
+        self.colors = colors
+        self.np_xs = np.frombuffer(self.xs, dtype=np.float64)
+        self.np_ys = np.frombuffer(self.ys, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def segment_at(self, x):
+        # Index of the segment (i, i + 1) containing x, or -1 if x is outside the terrain
+        xs = self.xs
+        if not xs or x < xs[0] or x > xs[-1]:
+            return -1
+        return min(bisect.bisect_right(xs, x), len(xs) - 1) - 1
+
+    def height_at(self, x):
+        i = self.segment_at(x)
+        if i < 0:
+            return 0
+        x1, x2 = self.xs[i], self.xs[i + 1]
+        y1, y2 = self.ys[i], self.ys[i + 1]
+        t = (x - x1) / (x2 - x1)
+        return y1 + t * (y2 - y1)
+
+    def heights_at(self, xs):
+        if len(self.xs) == 0:
+            return np.zeros(len(xs))
+        return np.interp(xs, self.np_xs, self.np_ys, left=0, right=0)
+
+    def slope_at(self, x):
+        i = self.segment_at(x)
+        if i < 0:
+            return 0
+        return (self.ys[i + 1] - self.ys[i]) / (self.xs[i + 1] - self.xs[i])
+
+    def points(self, first, last):
+        return list(zip(self.xs[first:last], self.ys[first:last], self.colors[first:last]))
+
+    def range(self, x0, x1):
+        # Slice bounds (first, last) of the points whose contour covers [x0, x1],
+        # including the points just outside the range so no edge segment is lost
+        first = max(0, bisect.bisect_right(self.xs, x0) - 1)
+        last = min(len(self.xs), bisect.bisect_left(self.xs, x1) + 1)
+        return first, last
@@ -0,0 +1,62 @@
+import arcade
+from collections import OrderedDict
+from constants import *
+
+TERRAIN_COLORS = [
+    (113, 255, 113),
+    (123, 215, 120),
+    (120, 255, 110),
+    arcade.color.SEA_BLUE,
+    arcade.color.DEEP_SKY_BLUE
+]
+
+class TerrainRenderer:
+    # Splits the terrain contour into fixed-width chunks. Each chunk is built into a
+    # single ShapeElementList (one vertex/color buffer, one draw call) the first time
+    # it becomes visible and is kept in a small LRU pool, so nothing is rebuilt per frame.
+    def __init__(self, terrain_index, chunk_width=TERRAIN_CHUNK_WIDTH, pool_size=TERRAIN_CHUNK_POOL_SIZE):
+        self.terrain_index = terrain_index
+        self.chunk_width = chunk_width
+        self.pool_size = pool_size
+        self.chunks = OrderedDict()
+
+    def get_chunk_range(self, start_x, end_x):
+        return int(start_x // self.chunk_width), int(end_x // self.chunk_width)
+
+    def build_chunk(self, index):
+        start_x = index * self.chunk_width
+        end_x = start_x + self.chunk_width
+
+        # Take every segment that overlaps the chunk, so neighbouring chunks join without gaps
+        points = self.terrain_index.points(*self.terrain_index.range(start_x, end_x))
+
+        vertices = []
+        colors = []
+        for (x0, y0, c0), (x1, y1, c1) in zip(points, points[1:]):
+            vertices += [(x0, 0), (x0, y0), (x1, y1), (x1, 0)]
+            colors += [arcade.color.DARK_GREEN, TERRAIN_COLORS[c0], TERRAIN_COLORS[c1], arcade.color.DARK_GREEN]
+
+        shape = arcade.shape_list.ShapeElementList()
+        if vertices:
+            shape.append(arcade.shape_list.create_rectangles_filled_with_colors(vertices, colors))
+        return shape
+
+    def get_chunk(self, index):
+        shape = self.chunks.get(index)
+        if shape is None:
+            shape = self.build_chunk(index)
+            self.chunks[index] = shape
+        else:
+            self.chunks.move_to_end(index)
+        return shape
+
+    def evict(self, keep):
+        # Drop the least recently drawn chunks, but never the ones needed this frame
+        while len(self.chunks) > max(self.pool_size, keep):
+            self.chunks.popitem(last=False)
+
+    def draw(self, start_x, end_x):
+        first, last = self.get_chunk_range(start_x, end_x)
+        for index in range(first, last + 1):
+            self.get_chunk(index).draw()
+        self.evict(last - first + 1)
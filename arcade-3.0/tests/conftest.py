@@ -0,0 +1,18 @@
+"""
+Unit tests for the game logic, run from the arcade-3.0 directory:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import pytest
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR)
+from sopwith import use_offscreen_if_no_display
+use_offscreen_if_no_display()
+
+@pytest.fixture(autouse=True)
+def game_dir(monkeypatch):
+    # Levels and textures are loaded relative to the game directory
+    monkeypatch.chdir(GAME_DIR)
@@ -0,0 +1,70 @@
+import pytest
+from collision import *
+
+SQUARE = [(0, 0), (10, 0), (10, 10), (0, 10)]
+
+@pytest.mark.parametrize("segments, expected", [
+    ((0, 0, 10, 10, 0, 10, 10, 0), True),        # crossing
+    ((0, 0, 10, 0, 5, 0, 5, 10), True),          # endpoint touching the middle
+    ((0, 0, 10, 0, 10, 0, 20, 5), True),         # sharing an endpoint
+    ((0, 0, 10, 0, 0, 5, 10, 5), False),         # parallel
+    ((0, 0, 10, 0, 11, -5, 11, 5), False),       # would cross if extended
+    ((20, 0, 30, 0, 0, 0, 10, 0), False),        # collinear, disjoint
+    ((0, 0, 10, 0, 20, 0, 30, 0), False),        # collinear, disjoint, other order
+    ((0, 0, 0, 10, 0, 20, 0, 30), False),        # collinear and vertical, disjoint
+    ((10, 0, 20, 0, 0, 0, 10, 0), True),         # collinear, end to end
+    ((5, 0, 15, 0, 0, 0, 10, 0), True),          # collinear, overlapping
+    ((2, 2, 4, 4, 0, 0, 10, 10), True),          # collinear, contained
+])
+def test_segments_intersect(segments, expected):
+    ax, ay, bx, by, cx, cy, dx, dy = segments
+    assert segments_intersect(*segments) == expected
+    assert segments_intersect(cx, cy, dx, dy, ax, ay, bx, by) == expected
+    assert segments_intersect(bx, by, ax, ay, dx, dy, cx, cy) == expected
+
+def test_segment_segment_distance():
+    assert segment_segment_distance_sq(0, 0, 10, 10, 0, 10, 10, 0) == 0
+    assert segment_segment_distance_sq(20, 0, 30, 0, 0, 0, 10, 0) == 100
+    assert segment_segment_distance_sq(0, 0, 10, 0, 0, 3, 10, 3) == 9
+
+def test_point_in_polygon():
+    assert point_in_polygon(5, 5, SQUARE)
+    assert not point_in_polygon(15, 5, SQUARE)
+    assert not point_in_polygon(-1, -1, SQUARE)
+
+@pytest.mark.parametrize("circle, expected", [
+    ((5, 5, 1), True),       # inside
+    ((12, 5, 2.5), True),    # overlapping an edge
+    ((12, 5, 2), True),      # touching an edge
+    ((12, 5, 1.5), False),
+    ((12, 12, 2.9), True),   # near a corner
+    ((12, 12, 2.8), False),
+])
+def test_circle_shapes(circle, expected):
+    assert circle_intersects_polygon(*circle, SQUARE) == expected
+    assert circle_intersects_aabb(*circle, 0, 0, 10, 10) == expected
+
+@pytest.mark.parametrize("sweep, expected", [
+    ((-20, 5, 20, 5, 0.5), True),      # passes through in one tick
+    ((-20, 15, 20, 15, 0.5), False),   # passes above
+    ((-20, 15, 20, 15, 5), True),      # passes above, but wide enough to graze it
+    ((5, 5, 6, 6, 0.5), True),         # starts inside
+    ((-20, 20, -10, 10, 0.5), False),  # heading for it, but stops short
+    ((20, 0, 30, 0, 0.5), False),      # along an edge's line, well clear of it
+    ((30, 0, 20, 0, 0.5), False),
+    ((20, 10, 30, 10, 0.5), False),
+    ((20, 0, 10.4, 0, 0.5), True),     # along an edge's line, ending within the radius
+    ((20, 0, 5, 0, 0.5), True),        # along an edge's line, overlapping it
+])
+def test_swept_circle_polygon(sweep, expected):
+    assert swept_circle_intersects_polygon(*sweep, SQUARE) == expected
+
+@pytest.mark.parametrize("sweep, expected", [
+    ((-20, 5, 20, 5, 0.5), True),
+    ((-20, 15, 20, 15, 0.5), False),
+    ((20, 0, 30, 0, 0.5), False),
+    ((20, 0, 10.4, 0, 0.5), True),
+    ((5, -20, 5, 20, 0), True),
+])
+def test_swept_circle_aabb(sweep, expected):
+    assert swept_circle_intersects_aabb(*sweep, 0, 0, 10, 10) == expected
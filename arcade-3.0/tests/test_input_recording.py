@@ -0,0 +1,59 @@
+import pytest
+from constants import *
+from input_recording import InputRecorder, InputReplay
+from sopwith.sim import RandomPolicy, ScriptedPolicy
+from world import World, ACTION_DECELERATE, ACTION_FLIP
+
+TICKS = 1500
+
+def get_state(world):
+    plane = world.plane
+    return {
+        "tick_count": world.tick_count,
+        "score": world.score,
+        "plane": (plane.position, plane.angle, plane.speed, plane.health),
+        "crashed": world.plane_crashed,
+        "destroyed": sorted(world.streamer.destroyed),
+        "projectiles": len(world.projectiles),
+    }
+
+def play(path, policy, level_seed):
+    world = World(level_seed=level_seed)
+    world.setup()
+    world.recorder = InputRecorder(path, world)
+    for tick in range(TICKS):
+        policy.act(world)
+        if tick == 500:
+            world.queue_action(ACTION_FLIP | ACTION_DECELERATE)
+        if tick == 800:
+            world.set_view_size(1024, 600)
+        world.tick()
+    world.recorder.close()
+    state = get_state(world)
+    world.close()
+    return state
+
+def replay(path):
+    recording = InputReplay(path)
+    world = World(recording.view_size, recording.level_seed)
+    world.setup()
+    world.replay = recording
+    while not recording.finished:
+        world.tick()
+    state = get_state(world)
+    world.close()
+    return state
+
+@pytest.mark.parametrize("level_seed", [None, 5])
+@pytest.mark.parametrize("policy", [ScriptedPolicy, RandomPolicy])
+def test_replay_matches_recording(tmp_path, policy, level_seed):
+    path = tmp_path / "session.rec"
+    recorded = play(path, policy(3), level_seed)
+    assert recorded["tick_count"] == TICKS
+    assert replay(path) == recorded
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "session.rec"
+    path.write_bytes(b"SOPL" + bytes(64))
+    with pytest.raises(ValueError):
+        InputReplay(path)
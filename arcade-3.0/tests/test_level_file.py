@@ -0,0 +1,50 @@
+import pytest
+from constants import *
+from level_file import LevelFile, compile_level, read_landscape_text, read_terrain_text
+from terrain_index import TerrainIndex
+
+@pytest.fixture
+def level_path(tmp_path):
+    path = tmp_path / "level.bin"
+    compile_level("terrain.txt", "landscape.txt", path)
+    return path
+
+def test_round_trip_terrain(level_path):
+    points = sorted(read_terrain_text("terrain.txt"))
+    with LevelFile(level_path) as level:
+        terrain = level.terrain_index()
+        assert terrain.points(0, len(terrain)) == [(float(x), float(y), c) for x, y, c in points]
+        del terrain
+
+def test_round_trip_targets(level_path):
+    source = TerrainIndex(sorted(read_terrain_text("terrain.txt")))
+    expected = [(x, source.height_at(x), n % len(TARGET_IMAGES)) for x, n in sorted(read_landscape_text("landscape.txt"))]
+    with LevelFile(level_path) as level:
+        assert list(level.targets()) == expected
+        # Every target is in exactly one chunk
+        chunks = range(level.first_chunk, level.first_chunk + level.chunk_count)
+        records = [record for chunk in chunks for record in level.read_chunk(chunk)]
+        assert [(x, y, n) for _, x, y, n in records] == expected
+
+def test_close_releases_mapping(level_path):
+    level = LevelFile(level_path)
+    level.close()
+    assert level.mmap.closed
+    level.close()
+
+def test_close_with_live_terrain_fails(level_path):
+    level = LevelFile(level_path)
+    terrain = level.terrain_index()
+    with pytest.raises(BufferError):
+        level.close()
+    del terrain
+
+def test_recompile_keeps_open_level_intact(level_path):
+    # The new file replaces the old one, so a level mapped before keeps reading the complete old file
+    with LevelFile(level_path) as level:
+        targets = list(level.targets())
+        compile_level("terrain.txt", "landscape.txt", level_path)
+        assert list(level.targets()) == targets
+    with LevelFile(level_path) as level:
+        assert list(level.targets()) == targets
+    assert [path.name for path in level_path.parent.iterdir()] == [level_path.name]
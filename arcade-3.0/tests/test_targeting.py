@@ -0,0 +1,78 @@
+import math
+import pytest
+import world as world_module
+from collision import segment_distance_sq
+from constants import *
+from projectiles import *
+from targeting import TICKS, solve_intercepts
+from world import World
+
+@pytest.fixture
+def world():
+    world = World()
+    world.setup()
+    yield world
+    world.close()
+
+@pytest.mark.parametrize("plane_offset, plane_velocity", [
+    ((250, 150), (-6, 0)),    # flying at the target
+    ((-200, 200), (5, 1)),    # flying at it from the other side
+    ((100, 250), (2, -1)),    # crossing overhead
+    ((150, 100), (3, 0)),     # flying away, slower than the bullet
+    ((300, 50), (0, 0)),      # standing still
+])
+def test_bullet_meets_plane(world, plane_offset, plane_velocity):
+    # Fire along the solved angle and step the bullet exactly as the game does
+    target = world.targets[0]
+    shooter = (target.center_x, target.center_y)
+    plane_position = (shooter[0] + plane_offset[0], shooter[1] + plane_offset[1])
+    angles, ticks, valid = solve_intercepts([shooter[0]], [shooter[1]], plane_position, plane_velocity)
+    assert valid[0]
+
+    world.target_fire_bullet(target, float(angles[0]))
+    pool = world.projectiles
+    slot = pool.slots(KIND_TARGET_BULLET)[0]
+    closest = math.inf
+    offset = (shooter[0] - plane_position[0], shooter[1] - plane_position[1])
+    for tick in range(1, math.ceil(ticks[0]) + 2):
+        pool.step(FIXED_TIMESTEP, world.time + tick * FIXED_TIMESTEP)
+        # The bullet's path during the tick, relative to the plane
+        previous = offset
+        offset = (pool.x[slot] - plane_position[0] - plane_velocity[0] * tick,
+                  pool.y[slot] - plane_position[1] - plane_velocity[1] * tick)
+        closest = min(closest, math.sqrt(segment_distance_sq(0, 0, *previous, *offset)))
+    assert closest < 1
+
+def test_out_of_reach():
+    _, _, valid = solve_intercepts([0, 0], [0, 0], (2000, 100), (0, 0))
+    assert not valid.any()
+
+def test_ticks_within_horizon():
+    _, ticks, valid = solve_intercepts([0, 100, 200], [0, 0, 0], (300, 100), (-4, 0))
+    assert valid.all()
+    assert ((ticks >= 1) & (ticks <= TICKS[-1])).all()
+
+def test_no_solution_backs_off(world, monkeypatch):
+    # A target that cannot reach the plane must not be solved for again on the next ticks
+    calls = []
+    def counting_solve(x, *args):
+        calls.append(len(x))
+        return solve_intercepts(x, *args)
+    monkeypatch.setattr(world_module, "solve_intercepts", counting_solve)
+
+    target = world.targets[0]
+    target.last_shot_time = -target.shoot_interval
+    world.target_index.get_active = lambda x, radius: [target]
+    # In range, but flying straight away faster than a bullet
+    world.plane.position = (target.center_x + TARGET_SHOOT_RANGE - 10, target.center_y + 50)
+    world.plane.change_x, world.plane.change_y = 40, 0
+    world.time = 10.0
+
+    world.update_targets()
+    assert calls == [1]
+    world.time += FIXED_TIMESTEP
+    world.update_targets()
+    assert calls == [1]
+    world.time += TARGET_AIM_RETRY
+    world.update_targets()
+    assert calls == [1, 1]
@@ -0,0 +1,36 @@
+from constants import *
+from terrain_generator import TerrainGenerator
+from terrain_index import TerrainIndex
+
+CHUNKS = range(-3, 12)
+
+def test_same_seed_same_chunks():
+    forward = [TerrainGenerator(7).generate(chunk) for chunk in CHUNKS]
+    generator = TerrainGenerator(7)
+    backward = {chunk: generator.generate(chunk) for chunk in reversed(CHUNKS)}
+    assert forward == [backward[chunk] for chunk in CHUNKS]
+
+def test_different_seeds_differ():
+    assert [TerrainGenerator(1).terrain(chunk) for chunk in CHUNKS] != [TerrainGenerator(2).terrain(chunk) for chunk in CHUNKS]
+
+def test_chunks_stay_in_their_range():
+    generator = TerrainGenerator(7)
+    for chunk in CHUNKS:
+        xs = [x for x, _, _ in generator.terrain(chunk)]
+        assert xs == sorted(xs)
+        assert xs[0] == chunk * generator.chunk_width
+        assert xs[-1] < (chunk + 1) * generator.chunk_width
+
+def test_adjacent_chunks_join():
+    generator = TerrainGenerator(7)
+    chunks = {chunk: generator.generate(chunk) for chunk in CHUNKS}
+    index = TerrainIndex([point for chunk in CHUNKS for point in chunks[chunk][0]])
+    for chunk in CHUNKS[1:]:
+        # The next chunk starts exactly where this one's contour was heading
+        x, y, _ = chunks[chunk][0][0]
+        assert y == generator.edge_height(chunk)
+        assert index.height_at(x) == y
+    for chunk in CHUNKS[:-1]:
+        # Targets were placed on the chunk joined to its neighbour, so they stand on the stitched terrain
+        for x, y, _ in chunks[chunk][1]:
+            assert abs(index.height_at(x) - y) < 1e-9
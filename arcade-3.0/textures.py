@@ -0,0 +1,47 @@
+import arcade
+from collections import OrderedDict
+from constants import *
+
+# Every image a world sprite is made from. They are decoded once into a shared cache and
+# packed into the window's atlas at startup. All sprite lists share that atlas, so each
+# layer draws in one batched call and nothing is looked up or uploaded mid-game.
+SPRITE_IMAGES = ["plane.png", "bomb.png"] + TARGET_IMAGES
+CIRCLE_DIAMETERS = [4, 6]  # Plane bullets and target bullets
+
+textures = {}
+circle_textures = OrderedDict()
+
+def get_texture(name, flipped=False):
+    texture = textures.get((name, flipped))
+    if texture is None:
+        texture = get_texture(name).flip_top_bottom() if flipped else arcade.load_texture(name)
+        textures[(name, flipped)] = texture
+    return texture
+
+def load_textures():
+    for name in SPRITE_IMAGES:
+        get_texture(name)
+    get_texture("plane.png", flipped=True)
+
+def pack_atlas(atlas):
+    # Add every sprite texture up front, so the atlas never grows or rebuilds during play
+    load_textures()
+    for texture in textures.values():
+        atlas.add(texture)
+    for diameter in CIRCLE_DIAMETERS:
+        atlas.add(arcade.SpriteCircle(diameter // 2, arcade.color.WHITE).texture)
+
+def get_circle_texture(radius, color, step=1, cache_size=KILL_ZONE_TEXTURE_CACHE_SIZE):
+    # Circle textures with their hit boxes, quantized to step pixels of radius and shared
+    # by every sprite that asks for the same size. Only the cache_size most recent are kept.
+    radius = max(step, int(round(radius / step)) * step)
+    key = (radius, tuple(color))
+    texture = circle_textures.get(key)
+    if texture is None:
+        texture = arcade.make_circle_texture(radius * 2, color)
+        circle_textures[key] = texture
+        if len(circle_textures) > cache_size:
+            circle_textures.popitem(last=False)
+    else:
+        circle_textures.move_to_end(key)
+    return texture
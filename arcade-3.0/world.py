@@ -0,0 +1,563 @@
+import arcade
+import math
+import bisect
+import numpy as np
+from constants import *
+from plane import Plane
+from bullet import Bullet
+from explosion import *
+from target import Target
+from projectiles import *
+from target_activation import TargetActivationIndex
+from targeting import solve_intercepts
+from profiling import NULL_TIMER
+from level_file import load_level
+from level_streamer import LevelStreamer
+from terrain_generator import GeneratedLevel
+from textures import get_texture, load_textures
+from collision import circle_intersects_sprite, swept_circle_intersects_sprite, get_sprites_hitting
+
+# Held keys and one-shot actions as bit masks. Actions are queued between ticks and
+# applied at the start of the next one, so every input lands on a tick boundary.
+KEY_UP, KEY_DOWN, KEY_LEFT, KEY_RIGHT = 1, 2, 4, 8
+ACTION_ACCELERATE, ACTION_DECELERATE, ACTION_FLIP, ACTION_BOMB, ACTION_FIRE = 1, 2, 4, 8, 16
+
+class World:
+    # All gameplay state and logic, independent of arcade.Window. The simulation advances
+    # in fixed FIXED_TIMESTEP ticks, so physics does not depend on the frame rate and the
+    # world can run without a window. Sprite lists are lazy, so no GL resources are created
+    # until something draws them.
+    def __init__(self, view_size=(SCREEN_WIDTH, SCREEN_HEIGHT), level_seed=LEVEL_SEED):
+        self.view_width, self.view_height = view_size
+        self.level_seed = level_seed
+        self.plane = Plane()
+        self.level = None
+        self.streamer = None
+        self.terrain_index = None
+        # Sprites that get hit are kept in spatial hashes, so collision checks only visit nearby cells
+        self.targets = arcade.SpriteList(use_spatial_hash=True, spatial_hash_cell_size=COLLISION_CELL_SIZE, lazy=True)
+        self.target_index = TargetActivationIndex()
+        self.bullets = arcade.SpriteList(lazy=True)
+        self.bombs = arcade.SpriteList(use_spatial_hash=True, spatial_hash_cell_size=COLLISION_CELL_SIZE, lazy=True)
+        self.target_bullets = arcade.SpriteList(lazy=True)
+        self.debug_sprites = arcade.SpriteList(lazy=True)
+        self.projectiles = ProjectilePool(sprite_pools={
+            KIND_BULLET: SpritePool(Bullet, BULLET_POOL_SIZE),
+            KIND_BOMB: SpritePool(lambda: arcade.Sprite(get_texture("bomb.png"), BOMB_SCALE), BOMB_POOL_SIZE),
+            KIND_TARGET_BULLET: SpritePool(lambda: arcade.SpriteCircle(3, arcade.color.RED), TARGET_BULLET_POOL_SIZE),
+        })
+        self.explosions = []
+        self.prev_bomb_time = 0
+        self.up_pressed = False
+        self.down_pressed = False
+        self.left_pressed = False
+        self.right_pressed = False
+        self.pending_actions = 0
+        self.recorder = None
+        self.replay = None
+        self.reset_timer = 0
+        self.time = 0.0
+        self.tick_count = 0
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.timer = NULL_TIMER
+        self.score = 0
+        self.debug_message = ""
+        self.plane_crashed = False
+        self.curr_plane_explosion = None
+        self.camera_x = self.view_width / 2
+        self.prev_camera_x = self.camera_x
+        self.prev_plane_position = self.plane.position
+        self.prev_plane_angle = self.plane.angle
+
+    def setup(self):
+        self.close()
+        load_textures()
+        self.level = load_level() if self.level_seed is None else GeneratedLevel(self.level_seed)
+        self.streamer = LevelStreamer(self.level)
+        self.targets = arcade.SpriteList(use_spatial_hash=True, spatial_hash_cell_size=COLLISION_CELL_SIZE, lazy=True)
+        self.target_index = TargetActivationIndex()
+        self.load_terrain()
+        self.update_streaming()
+        self.setup_plane()
+
+    def close(self):
+        # Releases the level, so setting the world up again or replacing it does not leak its mapping
+        if self.streamer is not None:
+            self.streamer.close()
+            self.streamer = None
+        if self.level is not None:
+            self.terrain_index = None
+            self.level.close()
+            self.level = None
+
+    def setup_plane(self):
+        self.plane.health = MAX_HEALTH
+        self.plane.center_y = self.terrain_index.height_at(self.plane.center_x) + self.plane.height / 2 + 5
+        self.prev_plane_position = self.plane.position
+
+    def load_terrain(self):
+        self.terrain_index = self.level.terrain_index()
+
+    def update_streaming(self):
+        # Targets, and for generated levels the terrain, only exist while their chunk is near the plane
+        loaded, evicted = self.streamer.update(self.plane.center_x, self.plane.change_x)
+        for target in evicted:
+            self.target_index.remove(target)
+            target.remove_from_sprite_lists()
+        for target in loaded:
+            self.targets.append(target)
+            self.target_index.add(target)
+
+    def remove_target(self, target):
+        self.streamer.destroy(target)
+        self.target_index.remove(target)
+        target.remove_from_sprite_lists()
+
+    def get_y_from_terrain(self, x):
+        return self.terrain_index.height_at(x)
+
+    def binary_search(self, x):
+        return bisect.bisect_left(self.terrain_index.xs, x)
+
+    def get_visible_terrain(self, start_x, end_x):
+        return self.terrain_index.points(*self.terrain_index.range(start_x, end_x))
+
+    @property
+    def view_left(self):
+        return self.camera_x - self.view_width / 2
+
+    def get_visible_range(self):
+        start_x = self.view_left - TERRAIN_BUFFER
+        end_x = self.view_left + self.view_width + TERRAIN_BUFFER
+        return start_x, end_x
+
+    def set_view_size(self, width, height):
+        self.view_width, self.view_height = width, height
+        if self.recorder is not None:
+            self.recorder.record_view_size(width, height)
+
+    def queue_action(self, action):
+        self.pending_actions |= action
+
+    def get_held_keys(self):
+        return ((KEY_UP if self.up_pressed else 0) | (KEY_DOWN if self.down_pressed else 0) |
+                (KEY_LEFT if self.left_pressed else 0) | (KEY_RIGHT if self.right_pressed else 0))
+
+    def set_held_keys(self, keys):
+        self.up_pressed = bool(keys & KEY_UP)
+        self.down_pressed = bool(keys & KEY_DOWN)
+        self.left_pressed = bool(keys & KEY_LEFT)
+        self.right_pressed = bool(keys & KEY_RIGHT)
+
+    def read_input(self):
+        # This tick's input, from the replay if there is one, goes to the recorder before it is applied
+        if self.replay is not None:
+            self.replay.apply(self)
+        actions, self.pending_actions = self.pending_actions, 0
+        if self.recorder is not None:
+            self.recorder.record(self.get_held_keys(), actions)
+        if actions & ACTION_ACCELERATE:
+            self.accelerate()
+        if actions & ACTION_DECELERATE:
+            self.decelerate()
+        if actions & ACTION_FLIP:
+            self.flip_plane()
+        if actions & ACTION_BOMB:
+            self.drop_bomb()
+        if actions & ACTION_FIRE:
+            self.fire_bullet()
+
+    def accelerate(self):
+        if self.plane.speed == 0:
+            self.plane.speed = max(1, PLANE_SPEED_MIN)
+        else:
+            self.plane.speed = min(PLANE_SPEED_MAX, self.plane.speed + 1)
+
+    def decelerate(self):
+        self.plane.speed = max(PLANE_SPEED_MIN, self.plane.speed - 1)
+
+    def flip_plane(self):
+        self.plane.flip()
+
+    def can_drop_bomb(self):
+        # only if interval has passed
+        return self.time - self.prev_bomb_time >= BOMB_DROP_INTERVAL
+
+    def drop_bomb(self):
+        if not self.can_drop_bomb():
+            return None
+        bomb = self.projectiles.acquire(KIND_BOMB)
+        if bomb is None:
+            return None
+
+        angle = (360 - self.plane.angle) % 360
+        angle = math.radians(angle)
+        bomb_x = self.plane.center_x + BOMB_DROP_OFFSET_X * math.cos(angle) - BOMB_DROP_OFFSET_Y * math.sin(angle)
+        bomb_y = self.plane.center_y + BOMB_DROP_OFFSET_X * math.sin(angle) + BOMB_DROP_OFFSET_Y * math.cos(angle)
+
+        bomb.center_x = bomb_x
+        bomb.center_y = bomb_y
+
+        bomb.change_x = self.plane.change_x * 1.1
+        bomb.change_y = self.plane.change_y * 1.1
+
+        bomb.angle = self.plane.angle - 80
+
+        if self.plane.flipped:
+            bomb.angle -= 180
+
+        self.bombs.append(bomb)
+        self.projectiles.add(bomb, KIND_BOMB, self.time)
+        self.prev_bomb_time = self.time
+        return bomb
+
+    def fire_bullet(self):
+        bullet = self.projectiles.acquire(KIND_BULLET)
+        if bullet is None:
+            return None
+        bullet.launch(self.plane, self.time)
+        self.bullets.append(bullet)
+        self.projectiles.add(bullet, KIND_BULLET, self.time)
+        return bullet
+
+    def target_fire_bullet(self, target, angle):
+        bullet_speed = BULLET_SPEED
+
+        bullet = self.projectiles.acquire(KIND_TARGET_BULLET)
+        if bullet is None:
+            return
+        bullet.alpha = 255
+        bullet.center_x = target.center_x
+        bullet.center_y = target.center_y
+
+        bullet.angle = angle
+        bullet.change_x = math.cos(math.radians(bullet.angle)) * bullet_speed
+        bullet.change_y = math.sin(math.radians(bullet.angle)) * bullet_speed
+
+        bullet.start_time = self.time
+        self.target_bullets.append(bullet)
+        self.projectiles.add(bullet, KIND_TARGET_BULLET, self.time)
+
+    def add_aim_debug_sprite(self, target, aim_position):
+        sprite = None
+        for s in self.debug_sprites:
+            if s.target == target:
+                sprite = s
+                break
+        if sprite is None:
+            sprite = arcade.SpriteCircle(3, arcade.color.YELLOW)
+            self.debug_sprites.append(sprite)
+            sprite.target = target
+            sprite.center_x = aim_position[0]
+            sprite.center_y = aim_position[1]
+            sprite.decay = BULLET_FADE_TIME_TARGET
+
+    def advance(self, delta_time):
+        # Run as many fixed ticks as the elapsed time allows and keep the remainder
+        # for the next frame. alpha is how far the renderer is between the last two ticks.
+        self.accumulator += delta_time
+        ticks = 0
+        while self.accumulator >= FIXED_TIMESTEP and ticks < MAX_TICKS_PER_FRAME:
+            if self.replay is not None and self.replay.finished:
+                # Hold at the last recorded tick until the replay is detached
+                break
+            self.tick()
+            self.accumulator -= FIXED_TIMESTEP
+            ticks += 1
+        if ticks == MAX_TICKS_PER_FRAME:
+            # Too far behind, drop the backlog instead of spiralling
+            self.accumulator = min(self.accumulator, FIXED_TIMESTEP)
+        self.alpha = self.accumulator / FIXED_TIMESTEP
+        return ticks
+
+    def tick(self, delta_time=FIXED_TIMESTEP):
+        timer = self.timer
+        with timer.phase("input"):
+            # Actions see the world as it was between ticks, where the keys were pressed
+            self.read_input()
+
+        self.time += delta_time
+        self.tick_count += 1
+        self.prev_plane_position = self.plane.position
+        self.prev_plane_angle = self.plane.angle
+        self.prev_camera_x = self.camera_x
+
+        with timer.phase("input"):
+            if self.up_pressed and self.plane.top < self.view_height:
+                self.plane.angle -= TILT_ANGLE
+            if self.down_pressed:
+                self.plane.angle += TILT_ANGLE
+
+        if not self.plane_crashed:
+            #convert angle from clockwise to counter-clockwise
+            dir_angle = (360 - self.plane.angle) % 360
+            self.plane.change_x = math.cos(math.radians(dir_angle)) * self.plane.speed
+            self.plane.change_y = math.sin(math.radians(dir_angle)) * self.plane.speed
+            with timer.phase("targets"):
+                self.update_targets()
+
+        with timer.phase("plane"):
+            # Prevent the plane from flying outside the top of the screen
+            if self.plane.top > self.view_height:
+                self.plane.top = self.view_height
+
+            # Check if self.curr_plane_explosion has ended and reset it
+            if self.curr_plane_explosion is not None and self.time - self.curr_plane_explosion.start_time > EXPLOSION_DURATION:
+                self.curr_plane_explosion = None
+
+            self.plane.update()
+        with timer.phase("projectiles"):
+            self.update_projectiles(delta_time)
+        with timer.phase("collisions"):
+            self.check_collisions()
+        with timer.phase("crash"):
+            self.check_crash(delta_time)
+        with timer.phase("viewport"):
+            self.scroll_viewport()
+        with timer.phase("streaming"):
+            self.update_streaming()
+        with timer.phase("explosions"):
+            self.update_explosions()
+
+        for s in self.debug_sprites:
+            s.decay -= delta_time
+            if s.decay <= 0:
+                s.kill()
+        self.debug_sprites.update()
+
+    def update_targets(self):
+        # Only targets in the buckets around the plane are simulated
+        active_radius = TARGET_SHOOT_RANGE + TARGET_ACTIVATION_MARGIN
+        plane = self.plane
+        ready = [target for target in self.target_index.get_active(plane.center_x, active_radius)
+                 if self.time - target.last_shot_time > target.shoot_interval and
+                 math.hypot(target.center_x - plane.center_x, target.center_y - plane.center_y) < TARGET_SHOOT_RANGE]
+        if not ready:
+            return
+
+        # Aim every ready target at once. Targets that cannot reach the plane hold their fire.
+        velocity = (plane.change_x, plane.change_y)
+        angles, ticks, valid = solve_intercepts(
+            [target.center_x for target in ready], [target.center_y for target in ready], plane.position, velocity)
+        for target, angle, tick, can_hit in zip(ready, angles, ticks, valid):
+            if not can_hit:
+                # Aim again a little later instead of solving for it on every tick
+                target.last_shot_time = self.time - target.shoot_interval + TARGET_AIM_RETRY
+                continue
+            self.target_fire_bullet(target, float(angle))
+            target.last_shot_time = self.time
+            if DEBUG_DRAW:
+                self.add_aim_debug_sprite(target, (plane.center_x + velocity[0] * tick, plane.center_y + velocity[1] * tick))
+
+    def update_explosions(self):
+        # Finished explosions are dropped, so the list only holds the ones still pending or active
+        alive = []
+        for explosion in self.explosions:
+            if self.time > explosion.start_time + EXPLOSION_DURATION:
+                explosion.kill()
+            else:
+                alive.append(explosion)
+        self.explosions = alive
+
+    def update_projectiles(self, delta_time):
+        for sprite in self.projectiles.step(delta_time, self.time):
+            self.projectiles.remove(sprite)
+        self.projectiles.sync(*self.get_visible_range())
+
+    def check_collisions(self):
+        pool = self.projectiles
+        view_left = self.view_left
+        view_right = view_left + self.view_width
+
+        slots = pool.slots(KIND_BULLET)
+        x, y, r = pool.x[slots], pool.y[slots], pool.half_height[slots]
+        gone = ((y - r <= self.terrain_index.heights_at(x)) | (y + r < 0) |
+                (x + r < view_left) | (x - r > view_right) |
+                (self.time - pool.start_time[slots] > BULLET_FADE_TIME_PLANE))
+        for slot in slots[gone]:
+            pool.remove(pool.sprites[slot])
+        for slot in slots[~gone]:
+            bullet = pool.sprites[slot]
+            hit_list = self.get_swept_hits(slot, self.targets)
+            if hit_list:
+                pool.remove(bullet)
+                for target in hit_list:
+                    self.add_explosion(target, 0.02)
+                    self.remove_target(target)
+                    self.score += 10
+
+        slots = pool.slots(KIND_BOMB)
+        grounded = pool.y[slots] - pool.half_height[slots] <= self.terrain_index.heights_at(pool.x[slots])
+        for slot in slots[grounded]:
+            pool.sync_slot(slot)
+            bomb = pool.sprites[slot]
+            self.add_explosion(bomb)
+            pool.remove(bomb)
+        for slot in slots[~grounded & pool.visible[slots]]:
+            bomb = pool.sprites[slot]
+            hit_list = arcade.check_for_collision_with_list(bomb, self.targets)
+            if hit_list:
+                self.add_explosion(bomb)
+                pool.remove(bomb)
+                for target in hit_list:
+                    self.add_explosion(target, 0.05)
+                    self.remove_target(target)
+                    self.score += 10
+
+        # Check for collision between the plane and the bombs
+        if self.time - self.prev_bomb_time > 0.15:
+            for bomb in get_sprites_hitting(self.plane, self.bombs):
+                if pool.visible[bomb.pool_slot]:
+                    self.crash_plane(self.plane, 0.1)
+                    self.add_explosion(bomb)
+                    pool.remove(bomb)
+
+        for slot in self.get_projectiles_hitting(self.plane, KIND_TARGET_BULLET):
+            bullet = pool.sprites[slot]
+            self.decrease_health(1)
+            self.curr_plane_explosion = self.add_explosion(bullet)
+            pool.remove(bullet)
+
+        for bomb in list(self.bombs):
+            if not pool.visible[bomb.pool_slot]:
+                continue
+            hit_slots = self.get_projectiles_hitting(bomb, KIND_TARGET_BULLET)
+            if hit_slots:
+                for slot in hit_slots:
+                    pool.remove(pool.sprites[slot])
+                pool.remove(bomb)
+                self.add_explosion(bomb)
+
+    def get_sweep(self, slot):
+        # Path of a round projectile during the last tick and its radius
+        pool = self.projectiles
+        return float(pool.prev_x[slot]), float(pool.prev_y[slot]), float(pool.x[slot]), float(pool.y[slot]), float(pool.half_height[slot])
+
+    def get_swept_hits(self, slot, sprite_list):
+        # Sprites of a spatially hashed list that the projectile's path touched
+        x0, y0, x1, y1, radius = sweep = self.get_sweep(slot)
+        rect = (min(x0, x1) - radius, max(x0, x1) + radius, min(y0, y1) - radius, max(y0, y1) + radius)
+        return [sprite for sprite in sprite_list.spatial_hash.get_sprites_near_rect(rect)
+                if swept_circle_intersects_sprite(*sweep, sprite)]
+
+    def get_projectiles_hitting(self, sprite, kind):
+        # Slots of the visible projectiles of one kind whose path touched sprite.
+        # A vectorized distance check leaves only the few nearby paths for the exact test.
+        pool = self.projectiles
+        slots = pool.slots(kind)
+        slots = slots[pool.visible[slots]]
+        x, y = pool.x[slots], pool.y[slots]
+        reach = (max(sprite.width, sprite.height) * 0.71 + pool.half_height[slots] +
+                 np.abs(x - pool.prev_x[slots]) + np.abs(y - pool.prev_y[slots]))
+        near = (np.abs(x - sprite.center_x) <= reach) & (np.abs(y - sprite.center_y) <= reach)
+        return [slot for slot in slots[near] if swept_circle_intersects_sprite(*self.get_sweep(slot), sprite)]
+
+    def decrease_health(self, amount: int):
+        self.plane.health -= amount
+        if self.plane.health <= 0:
+            self.crash_plane(self.plane, 0.1)
+
+    def add_explosion(self, sprite: arcade.Sprite, delay: float = 0.0):
+        explosion_size = (sprite.width + sprite.height) / 90
+        if len(self.explosions) == MAX_EXPLOSIONS:
+            self.explosions.pop(0)
+        if DEBUG_DRAW:
+            self.debug_message = f"Explosion size: {explosion_size:.2f}"
+        new_explosion = Explosion(
+            sprite.position,
+            explosion_size,
+            self.time + delay)
+        self.explosions.append(new_explosion)
+        return new_explosion
+
+    def check_crash(self, delta_time):
+        if not self.plane_crashed:
+            if self.plane.bottom + 2 < self.terrain_index.height_at(self.plane.center_x):
+                self.crash_plane(self.plane)
+
+        # Check collision with targets
+        hit_list = get_sprites_hitting(self.plane, self.targets)
+        if hit_list:
+            self.crash_plane(self.plane)
+            for target in hit_list:
+                self.add_explosion(target, 0.02)
+                self.remove_target(target)
+
+        # Check if the plane is near any active explosions
+        if not self.plane_crashed:
+            for explosion in self.explosions:
+                if self.curr_plane_explosion is not None and explosion.orig_position == self.curr_plane_explosion.orig_position:
+                    continue
+
+                if self.is_explosion_active(explosion):
+                    # The kill zone has always been a circle whose diameter is the kill radius
+                    explosion.kill_zone_radius = max(3, int(self.get_kill_radius(explosion))) / 2
+                    if not self.plane_crashed and self.curr_plane_explosion is None:
+                        x, y = explosion.orig_position
+                        if circle_intersects_sprite(x, y, explosion.kill_zone_radius, self.plane):
+                            self.crash_plane(self.plane, 0.1)
+                            break
+
+        # If the plane has crashed, apply gravity and air resistance
+        if self.plane_crashed:
+            if self.reset_timer > 0:
+                self.reset_plane(delta_time)
+            else:
+                self.plane.change_y -= 2.0 * delta_time
+                self.plane.angle = min(90, self.plane.angle + 30.0 * delta_time)
+                self.plane.change_x *= AIR_RESISTANCE
+                if self.plane.bottom <= self.terrain_index.height_at(self.plane.center_x):
+                    self.reset_plane(delta_time)
+                    self.add_explosion(self.plane, 0.1)
+
+    def crash_plane(self, sprite: arcade.Sprite, delay: float = 0.0):
+        if not self.plane_crashed:
+            self.plane_crashed = True
+            self.plane.speed = 0
+            self.score -= 15
+            explosion = self.add_explosion(sprite, delay)
+            if self.curr_plane_explosion is None:
+                self.curr_plane_explosion = explosion
+
+    def reset_plane(self, delta_time: float):
+        self.plane.speed = 0
+        self.plane.change_x = 0
+        self.plane.change_y = 0
+
+        self.reset_timer += delta_time
+
+        if self.reset_timer >= 3:
+            self.reset_timer = 0
+            self.plane_crashed = False
+            self.plane.health = MAX_HEALTH
+            self.plane.speed = 0
+            self.plane.angle = 0
+            self.plane.center_x = 0
+            self.update_streaming()
+            self.plane.center_y = 10 + self.terrain_index.height_at(self.plane.center_x) + self.plane.height / 2
+            self.prev_plane_position = self.plane.position
+            self.prev_plane_angle = self.plane.angle
+
+    def is_explosion_active(self, explosion):
+        return self.time >= explosion.start_time and self.time <= explosion.start_time + EXPLOSION_DURATION
+
+    def get_kill_radius(self, explosion):
+        elapsed_time = self.time - explosion.start_time
+        normalized_time = elapsed_time / EXPLOSION_DURATION
+        eased_time = 1 - (1 - normalized_time) ** 8
+        return 140 * explosion.size * eased_time
+
+    def scroll_viewport(self):
+        self.camera_x = arcade.math.lerp(self.camera_x, self.plane.center_x, 0.5)
+
+    def get_render_camera_x(self):
+        return self.prev_camera_x + (self.camera_x - self.prev_camera_x) * self.alpha
+
+    def get_render_plane_state(self):
+        # Plane position and angle between the previous and the current tick
+        x0, y0 = self.prev_plane_position
+        x1, y1 = self.plane.position
+        position = (x0 + (x1 - x0) * self.alpha, y0 + (y1 - y0) * self.alpha)
+        angle = self.prev_plane_angle + (self.plane.angle - self.prev_plane_angle) * self.alpha
+        return position, angle